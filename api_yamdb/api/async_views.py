@@ -0,0 +1,74 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse, HttpResponseNotAllowed
+
+from .middleware import count_queries
+from .views import CommentViewSet, ReviewViewSet, TitleViewSet
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_read_executor():
+    """Общий пул потоков для чтения: число одновременных обращений
+    к базе ограничено ASYNC_READ_THREADS, сколько бы ни было клиентов
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                settings.ASYNC_READ_THREADS, thread_name_prefix='async-read'
+            )
+        return _executor
+
+
+def run_view(view, request, args, kwargs):
+    """Выполняется в потоке пула: запросы к базе и рендеринг ответа.
+    Отдача ответа медленному клиенту идёт уже в цикле событий
+    """
+    counter = getattr(request, 'query_counter', None)
+    try:
+        with count_queries(counter) if counter else nullcontext():
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+            if response.streaming:
+                # Django 3.2 читает потоковый ответ в цикле событий,
+                # где запросы к базе запрещены: собираем его здесь
+                response = HttpResponse(
+                    b''.join(response.streaming_content),
+                    status=response.status_code,
+                    content_type=response['Content-Type']
+                )
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_read_view(viewset, actions):
+    """Асинхронное представление для чтения поверх действий вьюсета:
+    ответы совпадают с синхронными эндпоинтами
+    """
+    view = viewset.as_view(actions)
+    run = sync_to_async(run_view, thread_sensitive=False,
+                        executor=get_read_executor())
+
+    async def async_view(request, *args, **kwargs):
+        if request.method not in READ_METHODS:
+            return HttpResponseNotAllowed(READ_METHODS)
+        return await run(view, request, args, kwargs)
+
+    return async_view
+
+
+title_list = async_read_view(TitleViewSet, {'get': 'list'})
+title_detail = async_read_view(TitleViewSet, {'get': 'retrieve'})
+review_list = async_read_view(ReviewViewSet, {'get': 'list'})
+comment_list = async_read_view(CommentViewSet, {'get': 'list'})
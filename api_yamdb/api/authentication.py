@@ -0,0 +1,81 @@
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import get_response_cache
+from users.models import User
+
+ROLE_CLAIMS = ('username', 'role', 'is_superuser')
+AUTH_STATE_KEY = 'auth:state:{}'
+INACTIVE_STATE = 'inactive'
+
+
+def get_auth_state(user):
+    """Права пользователя, которые зашиты в токен"""
+    if not user.is_active:
+        return INACTIVE_STATE
+    return f'{user.role}:{int(user.is_superuser)}'
+
+
+def cache_auth_state(user_id, state):
+    get_response_cache().set(AUTH_STATE_KEY.format(user_id), state,
+                             settings.AUTH_STATE_CACHE_TIMEOUT)
+
+
+def get_cached_auth_state(user_id):
+    """Права пользователя из кэша. В базу обращаемся только при промахе
+    кэша, поэтому проверка актуальности токена обычно обходится без запроса
+    """
+    state = get_response_cache().get(AUTH_STATE_KEY.format(user_id))
+    if state is None:
+        user = User.objects.filter(pk=user_id).only(
+            'role', 'is_superuser', 'is_active'
+        ).first()
+        state = get_auth_state(user) if user else INACTIVE_STATE
+        cache_auth_state(user_id, state)
+    return state
+
+
+class RoleTokenUser(TokenUser):
+    """Пользователь, собранный из утверждений токена без запроса к базе"""
+    @property
+    def role(self):
+        return self.token['role']
+
+    @property
+    def is_admin(self):
+        return self.role == User.ADMIN
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+    @property
+    def is_user(self):
+        return self.role == User.USER
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """Аутентификация по токену с ролью внутри. Если роль в токене
+    устарела или её там нет, пользователь загружается из базы
+    """
+    def get_user(self, validated_token):
+        if not all(claim in validated_token for claim in ROLE_CLAIMS):
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise AuthenticationFailed(
+                'Token contained no recognizable user identification'
+            )
+        state = get_cached_auth_state(user_id)
+        if state == INACTIVE_STATE:
+            raise AuthenticationFailed('User is inactive',
+                                       code='user_inactive')
+        token_state = '{}:{}'.format(validated_token['role'],
+                                     int(validated_token['is_superuser']))
+        if state != token_state:
+            return super().get_user(validated_token)
+        return RoleTokenUser(validated_token)
@@ -0,0 +1,92 @@
+import hashlib
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+from .db import is_sticky
+
+CATALOG_VERSION_KEY = 'api:catalog:version'
+
+
+def get_response_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_catalog_version():
+    """Текущая версия каталога, входящая в ключи закэшированных ответов"""
+    cache = get_response_cache()
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, uuid4().hex, None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def invalidate_catalog():
+    """Сбрасываем все закэшированные ответы каталога сменой версии.
+    Случайная версия не совпадёт со старой, даже если ключ был вытеснен
+    """
+    get_response_cache().set(CATALOG_VERSION_KEY, uuid4().hex, None)
+
+
+class CachedResponseMixin:
+    """Кэширует JSON-ответы безопасных запросов и отдаёт их со строгим
+    ETag, отвечая 304 на совпадающий If-None-Match. Ссылки пагинации
+    в ответах абсолютные, поэтому схема и хост входят в ключ
+    """
+
+    def get_response_cache_key(self, request):
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        location = hashlib.md5('{}://{}{}?{}'.format(
+            request.scheme, request.get_host(), request.path, query
+        ).encode()).hexdigest()
+        return 'api:response:{}:{}:{}'.format(
+            get_catalog_version(), request.accepted_renderer.format, location
+        )
+
+    def use_response_cache(self, request):
+        """Пользователь, закреплённый после записи за основной базой, не
+        должен получить ответ, закэшированный по чтению из отстающей реплики
+        """
+        return (request.accepted_renderer.format == 'json'
+                and not is_sticky(request.user))
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if not self.use_response_cache(request):
+            return handler(request, *args, **kwargs)
+        cache = get_response_cache()
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        if cached is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            response.render()
+            cached = {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'etag': '"{}"'.format(
+                    hashlib.md5(response.content).hexdigest()
+                ),
+            }
+            cache.set(key, cached, settings.API_CACHE_TIMEOUT)
+        if cached['etag'] in parse_etags(
+            request.META.get('HTTP_IF_NONE_MATCH', '')
+        ):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(cached['content'],
+                                    content_type=cached['content_type'])
+        response['ETag'] = cached['etag']
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request,
+                                        *args, **kwargs)
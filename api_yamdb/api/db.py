@@ -0,0 +1,120 @@
+import random
+import time
+from contextvars import ContextVar
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError, transaction
+from rest_framework.permissions import SAFE_METHODS
+
+LOCKED_MESSAGES = ('database is locked', 'database table is locked')
+STICKY_PRIMARY_KEY = 'db:primary:{}'
+
+read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Настраиваем каждое новое соединение с SQLite прагмами из
+    settings.SQLITE_PRAGMAS: WAL, размер кэша, mmap, ожидание блокировки
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked(error):
+    return any(message in str(error) for message in LOCKED_MESSAGES)
+
+
+class RetryOnLockMixin:
+    """Повторяет изменяющие запросы, если SQLite вернул «database is
+    locked». Каждая попытка идёт в одной транзакции, поэтому после
+    ошибки в базе не остаётся частично записанных данных. Ошибки API
+    DRF превращает в ответ, поэтому при статусе 4xx и 5xx транзакцию
+    откатываем сами
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        # Тело читаем заранее, чтобы передать его каждой попытке
+        body = request.body
+        retries = settings.DB_LOCK_RETRIES
+        for attempt in range(retries + 1):
+            try:
+                with transaction.atomic():
+                    response = super().dispatch(request, *args, **kwargs)
+                    if response.status_code >= 400:
+                        transaction.set_rollback(True)
+                    return response
+            except OperationalError as error:
+                if not is_locked(error) or attempt == retries:
+                    raise
+            time.sleep(settings.DB_LOCK_BACKOFF * 2 ** attempt
+                       * random.uniform(0.5, 1.5))
+            request._stream = BytesIO(body)
+
+
+class ReplicaRouter:
+    """Направляет чтение на случайную реплику, пока в контексте запроса
+    включён read_from_replica. Запись всегда идёт в основную базу
+    """
+
+    def db_for_read(self, model, **hints):
+        if read_from_replica.get() and settings.READ_REPLICAS:
+            return random.choice(settings.READ_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        """Реплики получают схему вместе с данными при синхронизации"""
+        if db in settings.READ_REPLICAS:
+            return False
+        return None
+
+
+# Флаг хранится в кэше по умолчанию: он должен быть общим для всех
+# воркеров, как в settings_prod
+def stick_to_primary(user):
+    cache.set(STICKY_PRIMARY_KEY.format(user.id), True,
+              settings.REPLICA_STICKY_SECONDS)
+
+
+def is_sticky(user):
+    return bool(user.is_authenticated
+                and cache.get(STICKY_PRIMARY_KEY.format(user.id)))
+
+
+class ReadReplicaMixin:
+    """Безопасные запросы читают из реплик. Пользователь, который только
+    что что-то записал, некоторое время читает из основной базы и сразу
+    видит свои изменения
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = read_from_replica.set(False)
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        finally:
+            read_from_replica.reset(token)
+        if (self.request.method not in SAFE_METHODS
+                and response.status_code < 400
+                and self.request.user.is_authenticated):
+            stick_to_primary(self.request.user)
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_sticky(request.user):
+            read_from_replica.set(True)
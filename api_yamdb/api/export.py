@@ -0,0 +1,177 @@
+import csv
+import io
+import zlib
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+
+from reviews.models import Comment, Review
+from titles.models import Title
+from .fast_serializers import fast_title_list, title_rows
+from .renderers import FastJSONRenderer
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+EXPORT_FORMATS = (NDJSON, CSV)
+CSV_FIELDS = ('id', 'name', 'year', 'rating', 'description', 'genre',
+              'category')
+GZIP_WBITS = zlib.MAX_WBITS | 16
+
+
+def title_chunks(after_id=0, chunk_size=None):
+    """Произведения пачками по id больше after_id. Каждая пачка —
+    отдельный запрос по первичному ключу: память не растёт, а выгрузку
+    можно продолжить с последнего выгруженного id
+    """
+    chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+    while True:
+        rows = list(title_rows(
+            Title.objects.filter(id__gt=after_id).order_by('id')
+        )[:chunk_size])
+        if not rows:
+            return
+        yield fast_title_list(rows)
+        after_id = rows[-1][0]
+
+
+class OrderedRows:
+    """Поток строк, упорядоченных по ключу из первых key_size колонок.
+    Группы забираются по возрастанию ключа, строки с пропущенными
+    ключами отбрасываются
+    """
+
+    def __init__(self, rows, key_size):
+        self.rows = iter(rows)
+        self.key_size = key_size
+        self.row = next(self.rows, None)
+
+    def take(self, *key):
+        while self.row is not None and self.row[:self.key_size] < key:
+            self.row = next(self.rows, None)
+        while self.row is not None and self.row[:self.key_size] == key:
+            yield self.row[self.key_size:]
+            self.row = next(self.rows, None)
+
+
+def review_rows(title_ids, chunk_size):
+    """Отзывы и комментарии пачки произведений двумя запросами, которые
+    читаются серверным курсором по chunk_size строк. Оба упорядочены
+    по произведению и отзыву, поэтому сливаются по ходу чтения
+    """
+    reviews = Review.objects.filter(
+        title_id__in=title_ids, author__is_active=True
+    )
+    comments = Comment.objects.filter(
+        review__in=reviews.values('id'), author__is_active=True
+    )
+    return (
+        OrderedRows(reviews.order_by('title_id', 'id').values_list(
+            'title_id', 'id', 'author__username', 'text', 'score',
+            'pub_date'
+        ).iterator(chunk_size), 1),
+        OrderedRows(comments.order_by(
+            'review__title_id', 'review_id', 'id'
+        ).values_list(
+            'review__title_id', 'review_id', 'id', 'author__username',
+            'text', 'pub_date'
+        ).iterator(chunk_size), 2),
+    )
+
+
+def render_with_list(renderer, obj, key, items):
+    """JSON объекта obj с последним ключом key, список которого
+    собирается из потока items. Элемент — части уже отрендеренного
+    JSON, поэтому весь список в памяти не держится
+    """
+    separator = b',' if api_settings.COMPACT_JSON else b', '
+    # Объект с пустым списком заканчивается на b'[]}'
+    yield renderer.render({**obj, key: []})[:-2]
+    for number, item in enumerate(items):
+        if number:
+            yield separator
+        yield from item
+    yield b']}'
+
+
+def render_ndjson_with_reviews(titles, chunk_size=None):
+    """NDJSON пачки произведений с вложенными отзывами и комментариями.
+    Отзывы и комментарии рендерятся по мере чтения из базы, в памяти
+    нет ни всех отзывов пачки, ни всех отзывов одного произведения
+    """
+    renderer = FastJSONRenderer()
+    reviews, comments = review_rows(
+        [title['id'] for title in titles],
+        chunk_size or settings.STREAM_CHUNK_SIZE
+    )
+
+    def render_comments(title_id, review_id):
+        for pk, author, text, pub_date in comments.take(title_id,
+                                                        review_id):
+            yield (renderer.render({'id': pk, 'author': author,
+                                    'text': text, 'pub_date': pub_date}),)
+
+    def render_reviews(title_id):
+        for pk, author, text, score, pub_date in reviews.take(title_id):
+            yield render_with_list(renderer, {
+                'id': pk, 'author': author, 'text': text, 'score': score,
+                'pub_date': pub_date,
+            }, 'comments', render_comments(title_id, pk))
+
+    for title in titles:
+        yield from render_with_list(renderer, title, 'reviews',
+                                    render_reviews(title['id']))
+        yield b'\n'
+
+
+def render_ndjson(titles):
+    renderer = FastJSONRenderer()
+    return b''.join(renderer.render(title) + b'\n' for title in titles)
+
+
+def render_csv(titles, header=False):
+    """Жанры перечисляются через запятую, категория — по slug"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    if header:
+        writer.writerow(CSV_FIELDS)
+    for title in titles:
+        writer.writerow((
+            title['id'], title['name'], title['year'], title['rating'],
+            title['description'],
+            ','.join(genre['slug'] for genre in title['genre']),
+            title['category']['slug'] if title['category'] else '',
+        ))
+    return out.getvalue().encode()
+
+
+def export_catalog(output=NDJSON, after_id=0, reviews=False,
+                   chunk_size=None, progress=None):
+    """Каталог по пачкам в NDJSON или CSV. Отзывы и комментарии
+    вкладываются в записи произведений, поэтому есть только в NDJSON.
+    progress получает каждую выгруженную пачку произведений
+    """
+    if output not in EXPORT_FORMATS:
+        raise ValueError(f'Unknown export format: {output}')
+    if reviews and output != NDJSON:
+        raise ValueError('Reviews are exported only as NDJSON')
+    if output == CSV:
+        yield render_csv((), header=True)
+    for titles in title_chunks(after_id, chunk_size):
+        if reviews:
+            yield from render_ndjson_with_reviews(titles, chunk_size)
+        elif output == NDJSON:
+            yield render_ndjson(titles)
+        else:
+            yield render_csv(titles)
+        if progress is not None:
+            progress(titles)
+
+
+def gzip_chunks(chunks):
+    """Сжимает поток по мере выдачи пачек, без буфера на весь файл"""
+    compressor = zlib.compressobj(wbits=GZIP_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
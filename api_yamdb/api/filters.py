@@ -1,6 +1,8 @@
 from django_filters import filters
 from django_filters.rest_framework import FilterSet
+from rest_framework.filters import OrderingFilter
 from titles.models import Title
+from titles.search import search_titles
 
 
 class TitleFilterSet(FilterSet):
@@ -8,7 +10,29 @@ class TitleFilterSet(FilterSet):
     category = filters.CharFilter(field_name='category__slug')
     name = filters.CharFilter(field_name='name')
     year = filters.CharFilter(field_name='year')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = filters.NumberFilter(field_name='rating', lookup_expr='lte')
+    q = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = '__all__'
+        # Служебные поля рейтинга и is_deleted фильтрами не отдаём
+        fields = ('genre', 'category', 'name', 'year')
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """Сортировка произведений с добавлением id в том же направлении:
+    порядок страниц стабилен, а запрос идёт по составному индексу
+    """
+    ordering_fields = ('rating', 'year', 'review_count', 'name')
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering or ordering[-1].lstrip('-') in ('id', 'pk'):
+            return ordering
+        return (*ordering, '-id' if ordering[-1].startswith('-') else 'id')
@@ -1,29 +1,63 @@
 from titles.models import Category, Title, Genre
-from reviews.models import Review
+from reviews.models import Review, Comment
 from users.models import User
 
-"""Инициализация классов моделей для flake8"""
-imported_models = (Category, Genre, Title, Review, User)
+# Соответствие имён csv-файлов моделям, в которые они загружаются
+FILE_MODELS = {
+    'category': Category,
+    'genre': Genre,
+    'titles': Title,
+    'genre_title': Title.genre.through,
+    'users': User,
+    'review': Review,
+    'comments': Comment,
+}
 
 
-def get_object_from_model(key, value):
-    return eval(key.rstrip('_id').title()
-                ).objects.get(pk=value)
+class RowConverter:
+    """Превращает строку csv в объект модели. Внешние ключи проверяются
+    по заранее загруженным множествам id, без запроса на каждую строку
+    """
+    def __init__(self, model, columns):
+        self.model = model
+        self.fields = {}
+        self.known_ids = {}
+        for column in columns:
+            field = self.get_field(column)
+            self.fields[column] = field
+            if field.is_relation:
+                related_model = field.related_model
+                self.known_ids[column] = set(
+                    related_model.objects.values_list('pk', flat=True)
+                )
 
+    def get_field(self, column):
+        for field in self.model._meta.concrete_fields:
+            if column in (field.name, field.attname):
+                return field
+        raise KeyError(f'В модели {self.model.__name__} нет поля {column}')
 
-def change_id_to_command(dictionary):
-    raw_to_model_field = {
-        'author': 'user_id',
-        'category': 'category_id'
-    }
-    to_instance = ('author',)
-    for k, v in dictionary.items():
-        if k.endswith('_id') or k in raw_to_model_field.keys():
-            if k in to_instance:
-                tmp_k = raw_to_model_field[k]
-                dictionary[k] = get_object_from_model(tmp_k, v)
-            else:
-                tmp_k = k
-                dictionary[k] = get_object_from_model(
-                    tmp_k, v).id
-    return dictionary
+    def __call__(self, row):
+        """Возвращает объект модели или None, если строка ссылается
+        на несуществующий объект. Для битой строки — ValueError
+        """
+        if None in row:
+            raise ValueError('в строке больше значений, чем колонок')
+        kwargs = {}
+        for column, value in row.items():
+            field = self.fields[column]
+            if value is None:
+                raise ValueError(f'нет значения колонки {column}')
+            if value == '' and field.null:
+                value = None
+            if field.is_relation and value is not None:
+                try:
+                    value = int(value)
+                except ValueError:
+                    raise ValueError(
+                        f'колонка {column}: {value!r} не является id'
+                    )
+                if value not in self.known_ids[column]:
+                    return None
+            kwargs[field.attname] = value
+        return self.model(**kwargs)
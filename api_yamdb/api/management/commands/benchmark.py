@@ -0,0 +1,264 @@
+import json
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.cache import invalidate_catalog
+from api.views import get_tokens_for_user
+from reviews.models import Comment, Review
+from titles.models import Category, Genre, Title
+from users.models import User
+
+# Максимальное количество запросов к базе на один запрос к эндпоинту
+DEFAULT_THRESHOLDS = {
+    'titles-list': {'queries': 3},
+    'titles-list?genre': {'queries': 3},
+    'titles-detail': {'queries': 2},
+    'genres-list': {'queries': 2},
+    'categories-list': {'queries': 2},
+    'reviews-list': {'queries': 2},
+    'reviews-list?cursor': {'queries': 1},
+    'reviews-detail': {'queries': 1},
+    'comments-list': {'queries': 2},
+    'comments-list?cursor': {'queries': 1},
+    'comments-detail': {'queries': 1},
+    'users-list': {'queries': 2},
+    'users-detail': {'queries': 1},
+    'users-me': {'queries': 1},
+}
+
+
+class Command(BaseCommand):
+    help = ('Benchmark every read endpoint of the API against the current '
+            'database and report latency percentiles, queries per request '
+            'and throughput as JSON. Fails when thresholds are exceeded.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Measured requests per endpoint.')
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='Write the JSON report here.')
+        parser.add_argument('--thresholds',
+                            help='JSON file overriding default thresholds.')
+        parser.add_argument('--baseline',
+                            help='Previous report to compare against.')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed p95 slowdown against baseline.')
+        parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                            help='Ignore p95 slowdowns smaller than this.')
+        parser.add_argument('--cached', action='store_true',
+                            help='Keep the response cache between requests.')
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.samples = self.load_samples()
+        admin, _ = User.objects.get_or_create(
+            username='benchmark_admin',
+            defaults={'email': 'benchmark_admin@yamdb.fake',
+                      'role': User.ADMIN},
+        )
+        self.client = Client(HTTP_AUTHORIZATION='Bearer {}'.format(
+            get_tokens_for_user(admin)['access']
+        ))
+        self.samples['users'] = [admin.username]
+        report = {
+            'dataset': {
+                model._meta.label: model.objects.count()
+                for model in (Title, Genre, Category, Review, Comment, User)
+            },
+            'endpoints': {},
+        }
+        for label, route, make_url in self.get_endpoints():
+            if not self.samples.get(route.split('-')[0], True):
+                continue
+            report['endpoints'][label] = self.measure(
+                make_url, options['requests'], options['warmup'],
+                options['cached']
+            )
+        report['failures'] = self.check(report, options)
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as out:
+                out.write(output)
+        self.stdout.write(output)
+        if report['failures']:
+            raise CommandError(
+                f'{len(report["failures"])} benchmark threshold(s) exceeded'
+            )
+
+    def sample(self, queryset, fields, count=100):
+        """Случайные существующие объекты без ORDER BY RANDOM()
+        по всей таблице: ищем ближайший id к случайной точке
+        """
+        bounds = queryset.order_by('pk').values_list('pk', flat=True)
+        first, last = bounds.first(), bounds.last()
+        if first is None:
+            return []
+        rows = []
+        for _ in range(count):
+            pivot = self.random.randint(first, last)
+            rows.append(queryset.filter(pk__gte=pivot).order_by(
+                'pk'
+            ).values(*fields).first())
+        return rows
+
+    def load_samples(self):
+        return {
+            'titles': self.sample(Title.objects.all(), ('pk',)),
+            'genres': self.sample(Genre.objects.all(), ('slug',)),
+            'categories': [True],
+            'reviews': self.sample(Review.objects.all(), ('pk', 'title_id')),
+            'comments': self.sample(
+                Comment.objects.all(), ('pk', 'review_id', 'review__title_id')
+            ),
+        }
+
+    def pick(self, name):
+        return self.random.choice(self.samples[name])
+
+    def get_endpoints(self):
+        def title_url():
+            return reverse('api:titles-detail',
+                           kwargs={'pk': self.pick('titles')['pk']})
+
+        def reviews_url(cursor=''):
+            title_id = self.pick('reviews')['title_id']
+            return reverse('api:reviews-list',
+                           kwargs={'title_id': title_id}) + cursor
+
+        def review_url():
+            review = self.pick('reviews')
+            return reverse('api:reviews-detail', kwargs={
+                'title_id': review['title_id'], 'pk': review['pk']
+            })
+
+        def comments_url(cursor=''):
+            comment = self.pick('comments')
+            return reverse('api:comments-list', kwargs={
+                'title_id': comment['review__title_id'],
+                'review_id': comment['review_id'],
+            }) + cursor
+
+        def comment_url():
+            comment = self.pick('comments')
+            return reverse('api:comments-detail', kwargs={
+                'title_id': comment['review__title_id'],
+                'review_id': comment['review_id'],
+                'pk': comment['pk'],
+            })
+
+        def titles_by_genre_url():
+            return '{}?genre={}'.format(reverse('api:titles-list'),
+                                        self.pick('genres')['slug'])
+
+        def user_url():
+            return reverse('api:users-detail',
+                           kwargs={'username': self.pick('users')})
+
+        return (
+            ('titles-list', 'titles-list',
+             lambda: reverse('api:titles-list')),
+            ('titles-list?genre', 'genres-list', titles_by_genre_url),
+            ('titles-detail', 'titles-detail', title_url),
+            ('genres-list', 'genres-list',
+             lambda: reverse('api:genres-list')),
+            ('categories-list', 'categories-list',
+             lambda: reverse('api:categories-list')),
+            ('reviews-list', 'reviews-list', reviews_url),
+            ('reviews-list?cursor', 'reviews-list',
+             lambda: reviews_url('?pagination=cursor')),
+            ('reviews-detail', 'reviews-detail', review_url),
+            ('comments-list', 'comments-list', comments_url),
+            ('comments-list?cursor', 'comments-list',
+             lambda: comments_url('?pagination=cursor')),
+            ('comments-detail', 'comments-detail', comment_url),
+            ('users-list', 'users-list', lambda: reverse('api:users-list')),
+            ('users-detail', 'users-detail', user_url),
+            ('users-me', 'users-me', lambda: reverse('api:users-me')),
+        )
+
+    def measure(self, make_url, requests, warmup, cached):
+        durations = []
+        queries = []
+        errors = 0
+        for number in range(warmup + requests):
+            url = make_url()
+            if not cached:
+                invalidate_catalog()
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = self.client.get(url)
+                duration = time.perf_counter() - started
+            if number < warmup:
+                continue
+            if response.status_code != 200:
+                errors += 1
+            durations.append(duration)
+            queries.append(len(context.captured_queries))
+        durations.sort()
+        total = sum(durations)
+        return {
+            'requests': requests,
+            'errors': errors,
+            'p50_ms': round(statistics.median(durations) * 1000, 3),
+            'p95_ms': round(
+                durations[max(int(len(durations) * 0.95) - 1, 0)] * 1000, 3
+            ),
+            'mean_ms': round(total / len(durations) * 1000, 3),
+            'queries': max(queries),
+            'rps': round(len(durations) / total, 1) if total else None,
+        }
+
+    def load_json(self, path, default):
+        if not path:
+            return default
+        with open(path, encoding='utf-8') as source:
+            return json.load(source)
+
+    def check(self, report, options):
+        thresholds = {key: dict(value)
+                      for key, value in DEFAULT_THRESHOLDS.items()}
+        for key, value in self.load_json(options['thresholds'], {}).items():
+            thresholds.setdefault(key, {}).update(value)
+        baseline = self.load_json(
+            options['baseline'], {'endpoints': {}}
+        )['endpoints']
+        failures = []
+        for label, result in report['endpoints'].items():
+            limits = thresholds.get(label, {})
+            if result['errors']:
+                failures.append(f'{label}: {result["errors"]} errors')
+            for metric in ('queries', 'p95_ms', 'p50_ms'):
+                if metric in limits and result[metric] > limits[metric]:
+                    failures.append(
+                        f'{label}: {metric} {result[metric]} > '
+                        f'{limits[metric]}'
+                    )
+            if label in baseline:
+                failures.extend(self.compare(label, result, baseline[label],
+                                             options))
+        return failures
+
+    def compare(self, label, result, previous, options):
+        """Регрессии относительно предыдущего отчёта"""
+        failures = []
+        if result['queries'] > previous['queries']:
+            failures.append(
+                f'{label}: queries {result["queries"]} > baseline '
+                f'{previous["queries"]}'
+            )
+        allowed = max(previous['p95_ms'] * (1 + options['tolerance']),
+                      previous['p95_ms'] + options['min_delta_ms'])
+        if result['p95_ms'] > allowed:
+            failures.append(
+                f'{label}: p95_ms {result["p95_ms"]} > baseline '
+                f'{previous["p95_ms"]} +{options["tolerance"]:.0%}'
+            )
+        return failures
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+
+class Command(BaseCommand):
+    help = ('Compare the synchronous WSGI read path with the async ASGI one '
+            'under many concurrent slow keep-alive clients. Both handlers '
+            'get ASYNC_READ_THREADS threads; every client needs '
+            '--client-delay seconds to receive each response.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/v1/titles/',
+                            help='Synchronous endpoint; the async one is '
+                                 'the same path under /api/v1/async/.')
+        parser.add_argument('--clients', type=int, default=100)
+        parser.add_argument('--requests', type=int, default=5,
+                            help='Sequential requests per client.')
+        parser.add_argument('--client-delay', type=float, default=0.05)
+        parser.add_argument('--output', help='Write the JSON report here.')
+
+    def handle(self, *args, **options):
+        self.options = options
+        path = options['path']
+        async_path = path.replace('/api/v1/', '/api/v1/async/', 1)
+        report = {
+            'threads': settings.ASYNC_READ_THREADS,
+            'clients': options['clients'],
+            'requests_per_client': options['requests'],
+            'client_delay_s': options['client_delay'],
+            'wsgi': self.run_wsgi(path),
+            'asgi': asyncio.run(self.run_asgi(async_path)),
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as out:
+                out.write(output)
+        self.stdout.write(output)
+
+    def summarize(self, durations, statuses, total):
+        durations.sort()
+        return {
+            'requests': len(durations),
+            'errors': sum(status != 200 for status in statuses),
+            'p50_ms': round(statistics.median(durations) * 1000, 3),
+            'p95_ms': round(
+                durations[max(int(len(durations) * 0.95) - 1, 0)] * 1000, 3
+            ),
+            'max_ms': round(durations[-1] * 1000, 3),
+            'rps': round(len(durations) / total, 1),
+        }
+
+    def run_wsgi(self, path):
+        """Поток занят запросом, пока клиент не дочитает ответ"""
+        application = WSGIHandler()
+        factory = RequestFactory()
+        delay = self.options['client_delay']
+
+        def request():
+            statuses = []
+
+            def start_response(status, headers, exc_info=None):
+                statuses.append(int(status.split()[0]))
+
+            body = application(factory.get(path).environ, start_response)
+            try:
+                for _ in body:
+                    time.sleep(delay)
+            finally:
+                body.close()
+            return statuses[0]
+
+        def client():
+            results = []
+            previous = started
+            for _ in range(self.options['requests']):
+                status = request()
+                finished = time.perf_counter()
+                results.append((finished - previous, status))
+                previous = finished
+            return results
+
+        # Клиенты подключаются одновременно: ожидание свободного потока
+        # входит во время ответа. Поток держит соединение до конца
+        started = time.perf_counter()
+        with ThreadPoolExecutor(settings.ASYNC_READ_THREADS) as executor:
+            futures = [executor.submit(client)
+                       for _ in range(self.options['clients'])]
+            results = [result for future in futures
+                       for result in future.result()]
+        return self.summarize([duration for duration, _ in results],
+                              [status for _, status in results],
+                              time.perf_counter() - started)
+
+    async def run_asgi(self, path):
+        """Медленная отдача ответа ждёт в цикле событий, не занимая поток"""
+        application = get_asgi_application()
+        delay = self.options['client_delay']
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'},
+            'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': path, 'raw_path': path.encode(), 'query_string': b'',
+            'root_path': '', 'headers': [(b'host', b'testserver')],
+            'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+        }
+
+        async def request():
+            statuses = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b'',
+                        'more_body': False}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+                elif message['type'] == 'http.response.body':
+                    await asyncio.sleep(delay)
+
+            await application(dict(scope), receive, send)
+            return statuses[0]
+
+        async def client():
+            results = []
+            previous = started
+            for _ in range(self.options['requests']):
+                status = await request()
+                finished = time.perf_counter()
+                results.append((finished - previous, status))
+                previous = finished
+            return results
+
+        started = time.perf_counter()
+        clients = await asyncio.gather(
+            *(client() for _ in range(self.options['clients']))
+        )
+        results = [result for results in clients for result in results]
+        return self.summarize([duration for duration, _ in results],
+                              [status for _, status in results],
+                              time.perf_counter() - started)
@@ -0,0 +1,84 @@
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from api.fast_serializers import fast_title_list, title_rows
+from api.serializers import TitleListSerializer
+from api.views import TitleViewSet
+
+
+class Command(BaseCommand):
+    help = ('Compare TitleListSerializer with the values_list fast path on '
+            'one page of titles: CPU time and peak memory per row, '
+            'including queries and JSON rendering. Fails when the outputs '
+            'differ.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500,
+                            help='Titles on the measured page.')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--output', help='Write the JSON report here.')
+
+    def handle(self, *args, **options):
+        queryset = TitleViewSet.queryset.order_by('id')
+        rows = options['rows']
+
+        def drf():
+            titles = list(queryset[:rows])
+            return JSONRenderer().render(
+                TitleListSerializer(titles, many=True).data
+            )
+
+        def fast():
+            return JSONRenderer().render(
+                fast_title_list(list(title_rows(queryset)[:rows]))
+            )
+
+        drf_report, drf_content = self.measure(drf, options['repeat'])
+        fast_report, fast_content = self.measure(fast, options['repeat'])
+        if drf_content != fast_content:
+            raise CommandError('Fast path output differs from '
+                               'TitleListSerializer')
+        count = len(json.loads(drf_content)) or 1
+        report = {
+            'rows': count,
+            'drf': self.per_row(drf_report, count),
+            'fast': self.per_row(fast_report, count),
+        }
+        report['speedup'] = round(
+            report['drf']['cpu_us_per_row']
+            / max(report['fast']['cpu_us_per_row'], 0.001), 2
+        )
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as out:
+                out.write(output)
+        self.stdout.write(output)
+
+    def measure(self, func, repeat):
+        """Первый прогон прогревает кэши, память считаем отдельно:
+        tracemalloc заметно замедляет выполнение
+        """
+        content = func()
+        cpu = []
+        for _ in range(repeat):
+            started = time.process_time()
+            func()
+            cpu.append(time.process_time() - started)
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {'cpu': statistics.median(cpu), 'peak': peak}, content
+
+    def per_row(self, report, count):
+        return {
+            'cpu_us_per_row': round(report['cpu'] * 1e6 / count, 3),
+            'peak_bytes_per_row': round(report['peak'] / count),
+        }
@@ -0,0 +1,63 @@
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.export import EXPORT_FORMATS, NDJSON, export_catalog, gzip_chunks
+
+
+class Command(BaseCommand):
+    help = ('Export titles with genres, category and rating, optionally '
+            'with reviews and comments, as gzip-compressed NDJSON or CSV. '
+            'Titles are read in id order in chunks, so memory stays flat '
+            'and an interrupted export can continue with --after-id.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output',
+                            help='Target file, "-" for stdout. Defaults '
+                                 'to catalog.<format>.gz.')
+        parser.add_argument('--format', dest='export_format',
+                            choices=EXPORT_FORMATS, default=NDJSON)
+        parser.add_argument('--after-id', type=int, default=0,
+                            help='Export only titles with a greater id.')
+        parser.add_argument('--reviews', action='store_true',
+                            help='Nest reviews and comments (NDJSON only).')
+        parser.add_argument('--chunk-size', type=int,
+                            default=settings.STREAM_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        export_format = options['export_format']
+        if options['reviews'] and export_format != NDJSON:
+            raise CommandError('--reviews is supported only for NDJSON')
+        path = options['output'] or f'catalog.{export_format}.gz'
+        self.verbosity = options['verbosity']
+        self.started = time.monotonic()
+        self.exported = 0
+        self.last_id = options['after_id']
+        chunks = gzip_chunks(export_catalog(
+            export_format, options['after_id'], options['reviews'],
+            options['chunk_size'], progress=self.report
+        ))
+        if path == '-':
+            self.write(sys.stdout.buffer, chunks)
+        else:
+            with open(path, 'wb') as out:
+                self.write(out, chunks)
+        self.stderr.write(
+            f'Exported {self.exported} titles to {path} in '
+            f'{time.monotonic() - self.started:.1f}s, last id {self.last_id}'
+        )
+
+    def write(self, out, chunks):
+        for chunk in chunks:
+            out.write(chunk)
+
+    def report(self, titles):
+        """Последний id пачки: с него продолжается прерванная выгрузка"""
+        self.exported += len(titles)
+        self.last_id = titles[-1]['id']
+        if self.verbosity > 1:
+            self.stderr.write(
+                f'{self.exported} titles, last id {self.last_id}'
+            )
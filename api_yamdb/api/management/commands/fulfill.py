@@ -1,14 +1,15 @@
 import csv
+import os
+import time
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
-from ._utils import change_id_to_command
-from titles.models import Category, Genre, Title, GenreTitle
-from reviews.models import Review, Comment
-from users.models import User
-
-"""Инициализация классов моделей для flake8"""
-imported_models = (Category, Genre, Title, GenreTitle, Review, Comment, User)
+from api.cache import invalidate_catalog
+from ._utils import FILE_MODELS, RowConverter
+from reviews.models import Review
+from reviews.ratings import refresh_title_ratings
+from titles.models import CatalogVersion
 
 
 class Command(BaseCommand):
@@ -18,22 +19,91 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('file_names', nargs='+', type=str)
+        parser.add_argument('--path', default='static/data',
+                            help='Directory with csv files.')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Number of rows inserted per query.')
 
     def handle(self, *args, **options):
         for file_name in options['file_names']:
-            with open(f'static/data/{file_name}.csv', 'r',
-                      encoding='utf-8') as data_file:
-                f_name = file_name.capitalize()
-                if f_name.endswith('s'):
-                    f_name = f_name[:len(f_name) - 1]
-                if f_name.find('_') != -1:
-                    f_name = f_name.replace('_',
-                                            ' ').title().replace(' ', '')
-
-                data = [i for i in csv.DictReader(data_file,
-                                                  delimiter=',',
-                                                  quotechar='"')]
-
-                data = list(map(lambda x: change_id_to_command(x), data))
-                bulk_list = [eval(f_name)(**kwargs) for kwargs in data]
-                eval(f_name).objects.bulk_create(bulk_list)
+            if file_name not in FILE_MODELS:
+                raise CommandError(
+                    f'Unknown file {file_name}, expected one of: '
+                    f'{", ".join(FILE_MODELS)}'
+                )
+            path = os.path.join(options['path'], f'{file_name}.csv')
+            with open(path, 'r', encoding='utf-8') as data_file:
+                self.load(FILE_MODELS[file_name], data_file,
+                          options['batch_size'])
+        # bulk_create не отправляет post_save, кэши каталога сбрасываем сами
+        CatalogVersion.bump()
+        invalidate_catalog()
+
+    def load(self, model, data_file, batch_size):
+        """Потоково читает csv и вставляет объекты пачками
+        в одной транзакции
+        """
+        reader = csv.DictReader(data_file, delimiter=',', quotechar='"')
+        convert = self.get_converter(model, reader, data_file.name)
+        name = model._meta.label
+        started = time.monotonic()
+        loaded = skipped = 0
+        batch = []
+        title_ids = set()
+        with transaction.atomic():
+            for instance in self.convert_rows(reader, convert,
+                                              data_file.name):
+                if instance is None:
+                    skipped += 1
+                    continue
+                batch.append(instance)
+                if len(batch) >= batch_size:
+                    loaded += self.flush(model, batch, title_ids)
+                    self.report(name, loaded, started)
+            loaded += self.flush(model, batch, title_ids)
+            if title_ids:
+                refresh_title_ratings(title_ids)
+        self.report(name, loaded, started, ending='done')
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f'{name}: skipped {skipped} rows with unknown references'
+            ))
+
+    def get_converter(self, model, reader, file_name):
+        """Пустой файл или неизвестная колонка — ошибка команды"""
+        if not reader.fieldnames:
+            raise CommandError(f'{file_name}: no header row')
+        try:
+            return RowConverter(model, reader.fieldnames)
+        except KeyError as error:
+            raise CommandError(f'{file_name}: {error.args[0]}')
+
+    def convert_rows(self, reader, convert, file_name):
+        """Объекты модели по строкам csv. Битая строка прерывает загрузку
+        с номером строки, транзакция при этом откатывается
+        """
+        for row in reader:
+            try:
+                yield convert(row)
+            except ValueError as error:
+                raise CommandError(
+                    f'{file_name}, line {reader.line_num}: {error}'
+                )
+
+    def flush(self, model, batch, title_ids):
+        if model is Review:
+            title_ids.update(
+                review.title_id for review in batch if review.title_id
+            )
+        model.objects.bulk_create(batch)
+        count = len(batch)
+        batch.clear()
+        return count
+
+    def report(self, name, loaded, started, ending='loaded'):
+        elapsed = time.monotonic() - started
+        speed = loaded / elapsed if elapsed else loaded
+        self.stdout.write(
+            f'{name}: {ending} {loaded} rows in {elapsed:.1f}s '
+            f'({speed:.0f} rows/s)'
+        )
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from titles.search import install_search, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of titles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        started = time.monotonic()
+        install_search(connection)
+        rebuild_search_index(connection)
+        self.stdout.write(
+            f'Search index rebuilt in {time.monotonic() - started:.1f}s'
+        )
@@ -0,0 +1,103 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Max, Min
+
+from api.cache import invalidate_catalog
+from reviews.models import Review
+from reviews.ratings import (get_rating, get_rating_aggregates,
+                             refresh_title_ratings)
+from titles.models import Title
+
+RATING_TOLERANCE = 1e-9
+
+
+def recompute_chunk(start, end, fix):
+    """Сверяет сохранённые рейтинги произведений с id из [start, end)
+    с отзывами активных пользователей и при необходимости исправляет
+    расхождения
+    """
+    aggregates = get_rating_aggregates(
+        Review.objects.filter(title_id__gte=start, title_id__lt=end,
+                              author__is_active=True)
+    )
+    stored = Title.objects.filter(id__gte=start, id__lt=end).values_list(
+        'id', 'score_sum', 'review_count', 'rating'
+    )
+    checked = 0
+    drifted = []
+    for title_id, score_sum, review_count, rating in stored.order_by():
+        checked += 1
+        actual_sum, actual_count = aggregates.get(title_id, (0, 0))
+        actual_rating = get_rating(actual_sum, actual_count)
+        if (score_sum, review_count) == (actual_sum, actual_count) and (
+            rating == actual_rating
+            or rating is not None and actual_rating is not None
+            and abs(rating - actual_rating) < RATING_TOLERANCE
+        ):
+            continue
+        drifted.append(title_id)
+    if fix and drifted:
+        # Исправляем не прочитанными суммами, а пересчётом в самом UPDATE:
+        # отзывы могли измениться после сверки
+        refresh_title_ratings(drifted)
+    return checked, drifted
+
+
+class Command(BaseCommand):
+    help = ('Recompute review count, score sum and rating of every title '
+            'from reviews, report drift and fix it.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Title ids per grouped query.')
+        parser.add_argument('--workers', type=int, default=0,
+                            help='Processes to spread chunks over.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report drift.')
+
+    def handle(self, *args, **options):
+        bounds = Title.objects.aggregate(first=Min('id'), last=Max('id'))
+        if bounds['first'] is None:
+            self.stdout.write('No titles')
+            return
+        fix = not options['dry_run']
+        chunk_size = options['chunk_size']
+        chunks = [
+            (start, start + chunk_size, fix)
+            for start in range(bounds['first'], bounds['last'] + 1,
+                               chunk_size)
+        ]
+        started = time.monotonic()
+        if options['workers']:
+            # Дочерние процессы не должны унаследовать открытые соединения
+            connections.close_all()
+            with ProcessPoolExecutor(options['workers']) as executor:
+                results = executor.map(recompute_chunk, *zip(*chunks))
+                checked, drifted = self.collect(results)
+        else:
+            checked, drifted = self.collect(
+                recompute_chunk(*chunk) for chunk in chunks
+            )
+        if drifted and fix:
+            invalidate_catalog()
+        self.stdout.write(
+            f'Checked {checked} titles in {time.monotonic() - started:.1f}s, '
+            f'drift found in {len(drifted)}'
+            + (', fixed' if drifted and fix else '')
+        )
+        if drifted:
+            self.stdout.write('Drifted title ids: {}{}'.format(
+                ', '.join(map(str, drifted[:50])),
+                ' ...' if len(drifted) > 50 else ''
+            ))
+
+    def collect(self, results):
+        checked = 0
+        drifted = []
+        for chunk_checked, chunk_drifted in results:
+            checked += chunk_checked
+            drifted.extend(chunk_drifted)
+        return checked, drifted
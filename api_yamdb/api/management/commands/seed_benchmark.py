@@ -0,0 +1,142 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from api.cache import invalidate_catalog
+from reviews.models import Comment, Review
+from reviews.ratings import refresh_title_ratings
+from titles.models import CatalogVersion, Category, Genre, Title
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = ('Generate a reproducible synthetic dataset for the benchmark '
+            'command. Objects are appended after the existing ones.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=100000)
+        parser.add_argument('--reviews', type=int, default=5000000)
+        parser.add_argument('--comments', type=int, default=10000000)
+        parser.add_argument('--genres', type=int, default=50)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        titles = options['titles']
+        reviews = options['reviews']
+        # Отзывы раскладываются по произведениям по кругу, поэтому
+        # авторов нужно столько, сколько отзывов у самого популярного
+        users = max(-(-reviews // max(titles, 1)), 1)
+
+        self.first_ids = {
+            model: (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+            for model in (Category, Genre, Title, User, Review, Comment)
+        }
+        self.create(Category, options['categories'], self.make_category)
+        self.create(Genre, options['genres'], self.make_genre)
+        self.counts = {
+            'categories': options['categories'],
+            'genres': options['genres'],
+            'titles': titles,
+            'users': users,
+        }
+        self.create(Title, titles, self.make_title)
+        self.create(Title.genre.through, titles, self.make_title_genres)
+        self.create(User, users, self.make_user)
+        self.create(Review, reviews, self.make_review)
+        self.counts['reviews'] = reviews
+        self.create(Comment, options['comments'] if reviews else 0,
+                    self.make_comment)
+        started = time.monotonic()
+        first_title = self.first_ids[Title]
+        refresh_title_ratings(range(first_title, first_title + titles))
+        # bulk_create не отправляет post_save, кэши каталога сбрасываем сами
+        CatalogVersion.bump()
+        invalidate_catalog()
+        self.stdout.write(
+            f'ratings: refreshed in {time.monotonic() - started:.1f}s'
+        )
+
+    def create(self, model, count, make):
+        """Создаёт объекты пачками; make может вернуть несколько объектов"""
+        name = model._meta.label
+        started = time.monotonic()
+        batch = []
+        with transaction.atomic():
+            for number in range(count):
+                made = make(number)
+                if isinstance(made, list):
+                    batch.extend(made)
+                else:
+                    batch.append(made)
+                if len(batch) >= self.batch_size:
+                    model.objects.bulk_create(batch)
+                    batch.clear()
+            model.objects.bulk_create(batch)
+        self.stdout.write(
+            f'{name}: {count} in {time.monotonic() - started:.1f}s'
+        )
+
+    def pick(self, model, count):
+        return self.first_ids[model] + self.random.randrange(count)
+
+    def make_category(self, number):
+        return Category(pk=self.first_ids[Category] + number,
+                        name=f'Category {number}',
+                        slug=f'bench-category-{self.first_ids[Category]}'
+                             f'-{number}')
+
+    def make_genre(self, number):
+        return Genre(pk=self.first_ids[Genre] + number,
+                     name=f'Genre {number}',
+                     slug=f'bench-genre-{self.first_ids[Genre]}-{number}')
+
+    def make_title(self, number):
+        return Title(
+            pk=self.first_ids[Title] + number,
+            name=f'Title {number}',
+            year=self.random.randint(1900, 2020),
+            description=f'Synthetic description of title {number}',
+            category_id=self.pick(Category, self.counts['categories']),
+        )
+
+    def make_title_genres(self, number):
+        genres = self.random.sample(
+            range(self.counts['genres']), min(3, self.counts['genres'])
+        )
+        return [
+            Title.genre.through(
+                title_id=self.first_ids[Title] + number,
+                genre_id=self.first_ids[Genre] + genre
+            )
+            for genre in genres[:self.random.randint(1, len(genres))]
+        ]
+
+    def make_user(self, number):
+        username = f'bench{self.first_ids[User] + number}'
+        return User(pk=self.first_ids[User] + number, username=username,
+                    email=f'{username}@yamdb.fake')
+
+    def make_review(self, number):
+        titles = self.counts['titles']
+        return Review(
+            pk=self.first_ids[Review] + number,
+            title_id=self.first_ids[Title] + number % titles,
+            author_id=self.first_ids[User] + number // titles,
+            text=f'Synthetic review {number}',
+            score=self.random.randint(1, 10),
+        )
+
+    def make_comment(self, number):
+        return Comment(
+            pk=self.first_ids[Comment] + number,
+            review_id=self.pick(Review, self.counts['reviews']),
+            author_id=self.pick(User, self.counts['users']),
+            text=f'Synthetic comment {number}',
+        )
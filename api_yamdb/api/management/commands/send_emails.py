@@ -0,0 +1,68 @@
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from tasks.worker import QueueWorkerCommand
+from users.models import OutgoingEmail
+
+
+class Command(QueueWorkerCommand):
+    help = ('Send queued emails. Every thread claims a batch, sends it over '
+            'one SMTP connection and retries failures with backoff.')
+    model = OutgoingEmail
+    running_status = OutgoingEmail.SENDING
+    ready_field = 'next_attempt_at'
+    batch_size = 50
+    backoff = 30
+    claim_timeout = 300
+    result_message = 'Sent {} emails'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--max-attempts', type=int, default=5)
+
+    def process(self, batch):
+        sent = 0
+        try:
+            mail_connection = get_connection()
+            mail_connection.open()
+        except Exception as error:
+            for email in batch:
+                self.fail(email, error)
+            return sent
+        try:
+            for email in batch:
+                try:
+                    EmailMessage(
+                        subject=email.subject,
+                        body=email.message,
+                        from_email=email.from_email,
+                        to=(email.recipient,),
+                        connection=mail_connection
+                    ).send()
+                except Exception as error:
+                    self.fail(email, error)
+                    continue
+                email.status = OutgoingEmail.SENT
+                email.sent_at = timezone.now()
+                email.attempts += 1
+                # В тексте код подтверждения, после отправки он не нужен
+                email.message = ''
+                self.save(email, ('status', 'sent_at', 'attempts',
+                                  'message'))
+                sent += 1
+        finally:
+            mail_connection.close()
+        return sent
+
+    def fail(self, email, error):
+        email.attempts += 1
+        email.last_error = f'{type(error).__name__}: {error}'
+        if email.attempts >= self.options['max_attempts']:
+            email.status = OutgoingEmail.FAILED
+            email.message = ''
+        else:
+            email.status = OutgoingEmail.PENDING
+            email.next_attempt_at = self.get_retry_at(email.attempts)
+        self.save(email, ('attempts', 'last_error', 'status',
+                          'next_attempt_at', 'message'))
+        self.stderr.write(f'{email}: {email.last_error}')
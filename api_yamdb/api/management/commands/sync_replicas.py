@@ -0,0 +1,45 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from api.cache import invalidate_catalog
+
+
+class Command(BaseCommand):
+    help = ('Copy the primary SQLite database into every read replica '
+            'with the online backup API.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=5,
+                            help='Seconds between syncs.')
+        parser.add_argument('--once', action='store_true')
+
+    def handle(self, *args, **options):
+        if not settings.READ_REPLICAS:
+            self.stdout.write('No read replicas configured')
+            return
+        while True:
+            started = time.monotonic()
+            self.sync()
+            self.stdout.write(
+                f'Synced {len(settings.READ_REPLICAS)} replica(s) in '
+                f'{time.monotonic() - started:.2f}s'
+            )
+            if options['once']:
+                return
+            time.sleep(options['interval'])
+
+    def sync(self):
+        primary = connections[DEFAULT_DB_ALIAS]
+        primary.ensure_connection()
+        for alias in settings.READ_REPLICAS:
+            target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
+        # Ответы, закэшированные по отстающей реплике, больше не отдаются
+        invalidate_catalog()
@@ -0,0 +1,138 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+METRICS = (
+    ('duration', 'yamdb_request_duration_seconds',
+     'Request wall time by route.', DURATION_BUCKETS),
+    ('queries', 'yamdb_request_db_queries',
+     'Database queries per request by route.', QUERY_BUCKETS),
+    ('db_time', 'yamdb_request_db_duration_seconds',
+     'Time spent in database queries per request by route.',
+     DURATION_BUCKETS),
+)
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин"""
+    def __init__(self, buckets, counts=None, total=0.0):
+        self.buckets = buckets
+        self.counts = counts or [0] * (len(buckets) + 1)
+        self.total = total
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+
+    def to_dict(self):
+        return {'counts': self.counts, 'total': self.total}
+
+
+class MetricsRegistry:
+    """Метрики запросов текущего процесса, сгруппированные по маршрутам"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+        self.last_dump = 0.0
+
+    def observe(self, route, **values):
+        with self.lock:
+            histograms = self.routes.get(route)
+            if histograms is None:
+                histograms = self.routes[route] = {
+                    key: Histogram(buckets)
+                    for key, _, _, buckets in METRICS
+                }
+            for key, value in values.items():
+                histograms[key].observe(value)
+        self.dump_if_due()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                route: {key: h.to_dict() for key, h in histograms.items()}
+                for route, histograms in self.routes.items()
+            }
+
+    def dump(self):
+        """Сохраняем снимок метрик процесса в общий каталог, чтобы
+        эндпоинт метрик мог сложить данные всех воркеров
+        """
+        directory = settings.METRICS_DIR
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        os.makedirs(directory, exist_ok=True)
+        with open(f'{path}.tmp', 'w') as dump_file:
+            json.dump(self.snapshot(), dump_file)
+        os.replace(f'{path}.tmp', path)
+        self.last_dump = time.monotonic()
+
+    def dump_if_due(self):
+        if (settings.METRICS_DIR and time.monotonic() - self.last_dump
+                >= settings.METRICS_DUMP_INTERVAL):
+            self.dump()
+
+    def collect(self):
+        """Снимки метрик всех воркеров, если задан общий каталог,
+        иначе только текущего процесса
+        """
+        if not settings.METRICS_DIR:
+            return [self.snapshot()]
+        self.dump()
+        snapshots = []
+        for name in os.listdir(settings.METRICS_DIR):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(settings.METRICS_DIR, name)
+            try:
+                with open(path) as dump_file:
+                    snapshots.append(json.load(dump_file))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+
+registry = MetricsRegistry()
+
+
+def merge_snapshots(snapshots):
+    merged = {}
+    for snapshot in snapshots:
+        for route, histograms in snapshot.items():
+            target = merged.setdefault(route, {
+                key: Histogram(buckets) for key, _, _, buckets in METRICS
+            })
+            for key, data in histograms.items():
+                target[key].merge(Histogram(target[key].buckets,
+                                            data['counts'], data['total']))
+    return merged
+
+
+def render_prometheus(snapshots):
+    """Метрики в текстовом формате Prometheus"""
+    routes = merge_snapshots(snapshots)
+    lines = []
+    for key, name, description, buckets in METRICS:
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} histogram')
+        for route in sorted(routes):
+            histogram = routes[route][key]
+            label = 'route="{}"'.format(route.replace('"', '\\"'))
+            cumulative = 0
+            for bound, count in zip(buckets + ('+Inf',), histogram.counts):
+                cumulative += count
+                lines.append(
+                    f'{name}_bucket{{{label},le="{bound}"}} {cumulative}'
+                )
+            lines.append(f'{name}_sum{{{label}}} {histogram.total}')
+            lines.append(f'{name}_count{{{label}}} {cumulative}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,73 @@
+import asyncio
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+from .metrics import registry
+
+
+class QueryCounter:
+    """Обёртка выполнения запросов, считающая их количество и время"""
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+@contextmanager
+def count_queries(counter):
+    """Подключает счётчик к соединениям текущего потока"""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        yield counter
+
+
+class MetricsMiddleware:
+    """Замеряет время ответа, количество и время запросов к базе
+    для каждого маршрута. Под ASGI запросы к базе считает мост
+    асинхронных представлений в своём потоке через request.query_counter
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Признак, по которому Django 3.2 вызывает middleware асинхронно
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.acall(request)
+        counter = request.query_counter = QueryCounter()
+        started = time.perf_counter()
+        with count_queries(counter):
+            response = self.get_response(request)
+        self.observe(request, counter, started)
+        return response
+
+    async def acall(self, request):
+        counter = request.query_counter = QueryCounter()
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, counter, started)
+        return response
+
+    def observe(self, request, counter, started):
+        match = request.resolver_match
+        if match is not None:
+            registry.observe(
+                match.view_name,
+                duration=time.perf_counter() - started,
+                queries=counter.count,
+                db_time=counter.duration,
+            )
@@ -0,0 +1,51 @@
+from django.http import Http404
+from rest_framework.exceptions import AuthenticationFailed
+
+from users.models import User
+
+
+class NestedResourceMixin:
+    """Вложенные маршруты /titles/{title_id}/reviews/.../comments/.
+    Списки и объекты выбираются одним запросом, который сам проверяет всю
+    цепочку родителей. Родитель загружается отдельно только для записи или
+    когда страница списка пуста, чтобы отличить пустой список от 404,
+    и кэшируется до конца запроса
+    """
+    parent_model = None
+    # Поле родителя -> именованный параметр маршрута
+    parent_lookup = {}
+    # Постоянные условия на родителя и его предков
+    parent_filter = {}
+
+    def get_parent_queryset(self):
+        return self.parent_model.objects.filter(**{
+            field: self.kwargs.get(kwarg)
+            for field, kwarg in self.parent_lookup.items()
+        }, **self.parent_filter)
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            parent = self.get_parent_queryset().first()
+            if parent is None:
+                raise Http404
+            self._parent = parent
+        return self._parent
+
+    def get_author(self):
+        """Пользователь запроса как объект модели. Пользователь из токена
+        с ролью собран без запроса к базе, поэтому загружаем его
+        """
+        user = self.request.user
+        if isinstance(user, User):
+            return user
+        author = User.objects.filter(pk=user.id, is_active=True).first()
+        if author is None:
+            raise AuthenticationFailed('User is inactive',
+                                       code='user_inactive')
+        return author
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.get_parent()
+        return page
@@ -1,4 +1,4 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 
 class ComplexObjectPagination(PageNumberPagination):
@@ -7,3 +7,67 @@ class ComplexObjectPagination(PageNumberPagination):
     количество информации
     """
     page_size = 5
+
+
+class ComplexObjectCursorPagination(CursorPagination):
+    """Курсорная пагинация по дате публикации и id: глубокие страницы
+    выбираются по индексу так же быстро, как первая, без COUNT и OFFSET
+    """
+    page_size = ComplexObjectPagination.page_size
+
+
+class ReviewCursorPagination(ComplexObjectCursorPagination):
+    ordering = ('-pub_date', '-id')
+
+
+class CommentCursorPagination(ComplexObjectCursorPagination):
+    ordering = ('pub_date', 'id')
+
+
+class SelectablePagination(ComplexObjectPagination):
+    """Постраничная пагинация, которая переключается на курсорную,
+    если клиент передал ?pagination=cursor или курсор следующей страницы
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    cursor_pagination_class = None
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == self.cursor_mode
+            or self.cursor_pagination_class.cursor_query_param
+            in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            page = self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+            self.display_page_controls = (
+                self.cursor_paginator.display_page_controls
+            )
+            return page
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+
+class ReviewPagination(SelectablePagination):
+    cursor_pagination_class = ReviewCursorPagination
+
+
+class CommentPagination(SelectablePagination):
+    cursor_pagination_class = CommentCursorPagination
@@ -16,7 +16,7 @@ class IsAuthorOrReadOnly(BasePermission):
     """Допуск для автора"""
     def has_object_permission(self, request, view, obj):
         return (request.method in SAFE_METHODS
-                or obj.author == request.user)
+                or obj.author_id == request.user.id)
 
 
 class IsAdminOrAuthorOrModeratorOrReadOnly(BasePermission):
@@ -27,7 +27,7 @@ class IsAdminOrAuthorOrModeratorOrReadOnly(BasePermission):
 
     def has_object_permission(self, request, view, obj):
         return (request.method in SAFE_METHODS
-                or obj.author == request.user
+                or obj.author_id == request.user.id
                 or request.user.is_moderator
                 or request.user.is_admin)
 
@@ -46,4 +46,4 @@ class IsOwnerOrAdmin(BasePermission):
         return request.user.is_superuser or request.user.is_authenticated
 
     def has_object_permission(self, request, view, obj):
-        return obj.author == request.user or request.user.is_superuser
+        return obj.author_id == request.user.id or request.user.is_superuser
@@ -0,0 +1,52 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if orjson is not None else 0
+)
+LINE_SEPARATORS = (
+    (b'\xe2\x80\xa8', b'\\u2028'),
+    (b'\xe2\x80\xa9', b'\\u2029'),
+)
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Отдаёт уже подготовленный текст в формате Prometheus"""
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        return str(data).encode(self.charset)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson, если он установлен. Ответ побайтно
+    совпадает с JSONRenderer, кроме записи чисел с экспонентой (1e-7
+    вместо 1e-07). С отступами, ASCII или без compact-режима рендерит
+    стандартный json
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None
+                or self.get_indent(accepted_media_type,
+                                   renderer_context or {})
+                or self.ensure_ascii or not self.compact):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        if data is None:
+            return b''
+        content = orjson.dumps(data, default=self.encoder_class().default,
+                               option=ORJSON_OPTIONS)
+        # Как и JSONRenderer, экранируем разделители строк для JavaScript
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in content:
+                content = content.replace(separator, escaped)
+        return content
@@ -1,10 +1,12 @@
-from django.db.models import Avg
-
+from django.conf import settings
+from django.db import connections, router
 from rest_framework import serializers
-from rest_framework.generics import get_object_or_404
-from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueValidator
 
 from utlis.validators import validate_username
+from .export import EXPORT_FORMATS, NDJSON
+from titles.catalog import catalog_cache
 from titles.models import Category, Genre, Title
 from reviews.models import Review, Comment
 from users.models import User
@@ -30,6 +32,20 @@ class SignUpSerializer(serializers.Serializer):
         return data
 
 
+class CatalogExportSerializer(serializers.Serializer):
+    """Параметры выгрузки каталога из строки запроса"""
+    output = serializers.ChoiceField(choices=EXPORT_FORMATS, default=NDJSON)
+    after_id = serializers.IntegerField(min_value=0, default=0)
+    reviews = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if data['reviews'] and data['output'] != NDJSON:
+            raise serializers.ValidationError(
+                'Отзывы выгружаются только в формате ndjson'
+            )
+        return data
+
+
 class UserSerializer(serializers.ModelSerializer):
     """Сериализация объектов типа User."""
     class Meta:
@@ -38,11 +54,95 @@ class UserSerializer(serializers.ModelSerializer):
                   'last_name', 'bio', 'role')
 
 
+class BulkCreateListSerializer(serializers.ListSerializer):
+    """Создание списка объектов одним запросом: все элементы проверяются
+    заранее, ошибки возвращаются списком по элементам, а объекты
+    вставляются одним bulk_create
+    """
+
+    def to_internal_value(self, data):
+        if (isinstance(data, list)
+                and len(data) > settings.BULK_CREATE_MAX_ITEMS):
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f'Не больше {settings.BULK_CREATE_MAX_ITEMS} '
+                    f'объектов за один запрос'
+                ]
+            })
+        return super().to_internal_value(data)
+
+    def bulk_create(self, model, objects):
+        model.objects.bulk_create(objects)
+        features = connections[router.db_for_write(model)].features
+        if objects and not features.can_return_rows_from_bulk_insert:
+            # SQLite не возвращает id из bulk_create. Запись идёт в
+            # транзакции под блокировкой, поэтому последние строки — наши
+            ids = list(model._base_manager.order_by('-id').values_list(
+                'id', flat=True
+            )[:len(objects)])
+            for obj, pk in zip(objects, reversed(ids)):
+                obj.pk = pk
+        return objects
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        return self.bulk_create(model, [model(**item)
+                                        for item in validated_data])
+
+
+class UniqueSlugListSerializer(BulkCreateListSerializer):
+    """Уникальность slug проверяется одним запросом на весь список,
+    а не отдельным запросом UniqueValidator на каждый элемент
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        slug = self.child.fields['slug']
+        slug.validators = [validator for validator in slug.validators
+                           if not isinstance(validator, UniqueValidator)]
+
+    def get_slug_errors(self, data):
+        if not isinstance(data, list):
+            return []
+        slugs = [item.get('slug') if isinstance(item, dict) else None
+                 for item in data]
+        taken = set(self.child.Meta.model.objects.filter(
+            slug__in=[slug for slug in slugs if isinstance(slug, str)]
+        ).values_list('slug', flat=True))
+        seen = set()
+        errors = []
+        for slug in slugs:
+            if not isinstance(slug, str):
+                errors.append({})
+                continue
+            duplicate = slug in taken or slug in seen
+            seen.add(slug)
+            errors.append({'slug': [UniqueValidator.message]}
+                          if duplicate else {})
+        return errors
+
+    def to_internal_value(self, data):
+        slug_errors = self.get_slug_errors(data)
+        try:
+            validated = super().to_internal_value(data)
+        except serializers.ValidationError as error:
+            if not isinstance(error.detail, list):
+                raise
+            raise serializers.ValidationError([
+                {**slug_error, **item_error}
+                for slug_error, item_error in zip(slug_errors, error.detail)
+            ])
+        if any(slug_errors):
+            raise serializers.ValidationError(slug_errors)
+        return validated
+
+
 class GenreSerializer(serializers.ModelSerializer):
     """Сериализация объектов типа Genre"""
     class Meta:
         model = Genre
         fields = ('name', 'slug')
+        list_serializer_class = UniqueSlugListSerializer
         lookup_fields = 'slug'
         extra_kwargs = {
             'url': {'lookup_fields': 'slug'}
@@ -54,6 +154,7 @@ class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ('name', 'slug')
+        list_serializer_class = UniqueSlugListSerializer
         lookup_fields = 'slug'
         extra_kwargs = {
             'url': {'lookup_fields': 'slug'}
@@ -76,18 +177,51 @@ class TitleListSerializer(serializers.ModelSerializer):
         """Среднеарифметическое значение оценок,
         относящихся к одному произведению
         """
-        rating = obj.reviews.aggregate(Avg('score')).get('score__avg')
-        return round(rating, 1) if rating else None
+        return round(obj.rating, 1) if obj.rating is not None else None
+
+
+class CatalogSlugRelatedField(serializers.SlugRelatedField):
+    """Жанр или категория по slug из кэша каталога процесса,
+    без запроса к базе на каждое значение
+    """
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        obj = catalog_cache.get_by_slug(self.queryset.model, data)
+        if obj is None:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=data)
+        return obj
+
+
+class TitleBulkListSerializer(BulkCreateListSerializer):
+    """Произведения и их жанры: по одному bulk_create на таблицу.
+    Жанры и категории уже получены из кэша каталога при валидации
+    """
+
+    def create(self, validated_data):
+        titles = self.bulk_create(Title, [
+            Title(**{key: value for key, value in item.items()
+                     if key != 'genre'})
+            for item in validated_data
+        ])
+        GenreTitle = Title.genre.through
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title_id=title.pk, genre_id=genre.pk)
+            for title, item in zip(titles, validated_data)
+            for genre in dict.fromkeys(item['genre'])
+        )
+        return titles
 
 
 class TitleCreateSerializer(serializers.ModelSerializer):
     """Сериализация для небезопасных запросов модели Title"""
-    genre = serializers.SlugRelatedField(
+    genre = CatalogSlugRelatedField(
         queryset=Genre.objects.all(),
         slug_field='slug',
         many=True
     )
-    category = serializers.SlugRelatedField(
+    category = CatalogSlugRelatedField(
         queryset=Category.objects.all(),
         slug_field='slug',
     )
@@ -96,6 +230,7 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         fields = ('name', 'year', 'description', 'genre', 'category')
         model = Title
         read_only_fields = ('category',)
+        list_serializer_class = TitleBulkListSerializer
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -112,19 +247,7 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = '__all__'
-
-    def validate(self, data):
-        request = self.context['request']
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        if request.method == 'POST':
-            if Review.objects.filter(
-                title=title, author=request.user
-            ).exists():
-                raise ValidationError('Вы не можете добавить более'
-                                      'одного отзыва на произведение')
-        return data
+        fields = ('id', 'title', 'author', 'text', 'score', 'pub_date')
 
 
 class CommentSerializer(serializers.ModelSerializer):
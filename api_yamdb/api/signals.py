@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import INACTIVE_STATE, cache_auth_state, get_auth_state
+from .cache import invalidate_catalog
+from reviews.models import Review
+from titles.models import Category, Genre, Title
+from users.models import User
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_catalog_cache(sender, **kwargs):
+    """Изменения каталога и оценок, в том числе через админку,
+    сбрасывают закэшированные ответы. Сбрасываем после коммита, иначе
+    параллельный GET закэширует старые строки под новой версией
+    """
+    transaction.on_commit(invalidate_catalog)
+
+
+@receiver(post_save, sender=User)
+def update_auth_state(sender, instance, **kwargs):
+    """Смена роли сразу делает устаревшими выданные ранее токены.
+    Права кэшируем после коммита: откаченное сохранение их не меняет
+    """
+    state = get_auth_state(instance)
+    transaction.on_commit(lambda: cache_auth_state(instance.pk, state))
+
+
+@receiver(post_delete, sender=User)
+def revoke_auth_state(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: cache_auth_state(user_id, INACTIVE_STATE))
@@ -0,0 +1,82 @@
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
+from rest_framework.settings import api_settings
+
+from .permissions import AdminOnly
+from .renderers import FastJSONRenderer
+
+STREAM_QUERY_PARAM = 'stream'
+
+
+def queryset_chunks(queryset):
+    """Списки по STREAM_CHUNK_SIZE объектов из серверного курсора"""
+    size = settings.STREAM_CHUNK_SIZE
+    iterator = queryset.iterator(chunk_size=size)
+    return iter(lambda: list(islice(iterator, size)), [])
+
+
+def stream_json_array(chunks, renderer=None):
+    """JSON-массив по частям: каждая пачка объектов рендерится отдельно,
+    поэтому в памяти не бывает больше одной пачки
+    """
+    renderer = renderer or FastJSONRenderer()
+    separator = b',' if api_settings.COMPACT_JSON else b', '
+    yield b'['
+    first = True
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if not first:
+            yield separator
+        yield renderer.render(chunk)[1:-1]
+        first = False
+    yield b']'
+
+
+class StreamingListMixin:
+    """Список целиком, без пагинации, по ?stream=true: объекты читаются
+    серверным курсором пачками по STREAM_CHUNK_SIZE и сразу отдаются
+    клиенту, память не растёт с размером выборки
+    """
+    # Список целиком без пагинации и кэша дорог для базы, поэтому
+    # отдаётся только админам, как и выгрузка каталога
+    stream_permission_classes = (AdminOnly,)
+
+    def use_stream(self, request):
+        if (request.query_params.get(STREAM_QUERY_PARAM) not in ('true', '1')
+                or request.accepted_renderer.format != 'json'):
+            return False
+        for permission_class in self.stream_permission_classes:
+            permission = permission_class()
+            if not permission.has_permission(request, self):
+                self.permission_denied(
+                    request, message=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None)
+                )
+        return True
+
+    def get_stream_chunks(self, queryset):
+        """iterator() не выполняет prefetch_related, делаем его по пачкам"""
+        lookups = queryset._prefetch_related_lookups
+        for chunk in queryset_chunks(queryset):
+            prefetch_related_objects(chunk, *lookups)
+            yield self.get_serializer(chunk, many=True).data
+
+    def stream_list(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        # Генератор выполняется после выхода из представления,
+        # поэтому база выбирается сейчас
+        queryset = queryset.using(queryset.db)
+        return StreamingHttpResponse(
+            stream_json_array(self.get_stream_chunks(queryset),
+                              request.accepted_renderer),
+            content_type='application/json'
+        )
+
+    def list(self, request, *args, **kwargs):
+        if self.use_stream(request):
+            return self.stream_list(request)
+        return super().list(request, *args, **kwargs)
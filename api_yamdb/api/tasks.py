@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.db import transaction
+
+from reviews.models import Comment, Review
+from reviews.ratings import refresh_title_ratings
+from tasks.queue import task
+from titles.models import Title
+from users.models import User
+
+
+def delete_in_chunks(queryset, refresh_ratings=False):
+    """Удаляет объекты пачками по PURGE_CHUNK_SIZE, каждую в своей
+    короткой транзакции, чтобы не держать блокировку базы надолго.
+    С refresh_ratings удаляются отзывы: рейтинги их произведений
+    пересчитываются в той же транзакции, ведь оценки скрытых отзывов
+    уже исключены из рейтинга и сигналы удаления вычли бы их повторно
+    """
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[
+            :settings.PURGE_CHUNK_SIZE
+        ])
+        if not ids:
+            return deleted
+        chunk = queryset.model._base_manager.filter(pk__in=ids)
+        with transaction.atomic():
+            if refresh_ratings:
+                title_ids = set(chunk.exclude(
+                    title_id=None
+                ).values_list('title_id', flat=True))
+            deleted += chunk.delete()[0]
+            if refresh_ratings:
+                refresh_title_ratings(title_ids)
+
+
+@task
+def send_outgoing_emails():
+    """Отправляет накопившиеся письма из очереди"""
+    call_command('send_emails', once=True, threads=1)
+
+
+@task
+def recompute_ratings():
+    """Сверяет сохранённые рейтинги произведений с отзывами"""
+    call_command('recompute_ratings')
+
+
+@task
+def rebuild_title_search():
+    call_command('rebuild_title_search')
+
+
+@task
+def purge_title(title_id):
+    """Физически удаляет скрытое произведение с отзывами и комментариями"""
+    delete_in_chunks(Comment.objects.filter(review__title_id=title_id))
+    delete_in_chunks(Review.all_objects.filter(title_id=title_id))
+    Title.all_objects.filter(pk=title_id, is_deleted=True).delete()
+
+
+@task
+def purge_review(review_id):
+    delete_in_chunks(Comment.objects.filter(review_id=review_id))
+    Review.all_objects.filter(pk=review_id, is_deleted=True).delete()
+
+
+@task
+def purge_user(user_id):
+    """Удаляет отзывы и комментарии деактивированного пользователя,
+    затем его самого. Оценки исключены из рейтингов ещё при деактивации
+    """
+    delete_in_chunks(Comment.objects.filter(author_id=user_id))
+    delete_in_chunks(Comment.objects.filter(review__author_id=user_id))
+    delete_in_chunks(Review.all_objects.filter(author_id=user_id),
+                     refresh_ratings=True)
+    User.objects.filter(pk=user_id, is_active=False).delete()
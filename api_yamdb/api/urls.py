@@ -1,8 +1,10 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from . import async_views
 from .views import (CategoryViewSet, GenreViewSet, TitleViewSet,
-                    ReviewViewSet, CommentViewSet, SignUpViewSet, UserViewSet)
+                    ReviewViewSet, CommentViewSet, SignUpViewSet, UserViewSet,
+                    CatalogExportView, MetricsView)
 
 app_name = 'api'
 
@@ -42,6 +44,20 @@ router_api_v1.register(
     UserViewSet,
     basename='users')
 
+# Асинхронные эндпоинты для чтения, рассчитаны на запуск под ASGI
+async_urlpatterns = [
+    path('titles/', async_views.title_list, name='async-titles-list'),
+    path('titles/<int:pk>/', async_views.title_detail,
+         name='async-titles-detail'),
+    path('titles/<int:title_id>/reviews/', async_views.review_list,
+         name='async-reviews-list'),
+    path('titles/<int:title_id>/reviews/<int:review_id>/comments/',
+         async_views.comment_list, name='async-comments-list'),
+]
+
 urlpatterns = [
+    path('v1/_metrics', MetricsView.as_view(), name='metrics'),
+    path('v1/export/', CatalogExportView.as_view(), name='export'),
+    path('v1/async/', include(async_urlpatterns)),
     path('v1/', include(router_api_v1.urls))
 ]
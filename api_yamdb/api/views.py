@@ -1,6 +1,6 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 
@@ -10,24 +10,43 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from api_yamdb import settings
-from .filters import TitleFilterSet
-from .serializers import (GenreSerializer, CategorySerializer,
+from .cache import CachedResponseMixin, invalidate_catalog
+from .db import ReadReplicaMixin, RetryOnLockMixin
+from .export import export_catalog, gzip_chunks
+from .fast_serializers import fast_title_list, title_rows
+from .nested import NestedResourceMixin
+from .streaming import StreamingListMixin, queryset_chunks
+from .filters import TitleFilterSet, TitleOrderingFilter
+from .metrics import registry, render_prometheus
+from .serializers import (CatalogExportSerializer,
+                          GenreSerializer, CategorySerializer,
                           CommentSerializer, ReviewSerializer,
                           TitleListSerializer, TitleCreateSerializer,
                           UserSerializer, SignUpSerializer)
-from titles.models import Title, Genre, Category
-from reviews.models import Review
-from .pagination import ComplexObjectPagination
+from titles.catalog import catalog_cache
+from titles.models import CatalogVersion, Category, Genre, Title
+from reviews.models import Comment, Review
+from reviews.ratings import refresh_title_ratings
+from .pagination import (ComplexObjectPagination, CommentPagination,
+                         ReviewPagination)
+from .renderers import PrometheusRenderer
 from .permissions import (AdminOnly, IsAdminOrReadOnly,
                           IsAdminOrAuthorOrModeratorOrReadOnly)
-from users.models import User
+from users.models import OutgoingEmail, User
+from tasks.queue import enqueue
+from .tasks import purge_review, purge_title, purge_user
 
 
 def get_tokens_for_user(user):
     refresh = RefreshToken.for_user(user)
+    refresh['username'] = user.username
+    refresh['role'] = user.role
+    refresh['is_superuser'] = user.is_superuser
 
     return {
         'refresh': str(refresh),
@@ -35,6 +54,20 @@ def get_tokens_for_user(user):
     }
 
 
+class BulkCreateMixin:
+    """POST со списком объектов создаёт их все или, если хоть один
+    не прошёл проверку, возвращает ошибки по каждому элементу
+    """
+
+    def is_bulk(self):
+        return isinstance(self.request.data, list)
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action == 'create' and self.is_bulk():
+            kwargs.update(many=True, allow_empty=False)
+        return super().get_serializer(*args, **kwargs)
+
+
 class ListCreateDestroyViewSet(mixins.ListModelMixin,
                                mixins.CreateModelMixin,
                                mixins.DestroyModelMixin,
@@ -42,15 +75,25 @@ class ListCreateDestroyViewSet(mixins.ListModelMixin,
     pass
 
 
-class GenreCategoryViewSet(ListCreateDestroyViewSet):
+class GenreCategoryViewSet(RetryOnLockMixin, ReadReplicaMixin,
+                           BulkCreateMixin, CachedResponseMixin,
+                           ListCreateDestroyViewSet):
     pagination_class = PageNumberPagination
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
 
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        if self.is_bulk():
+            # bulk_create не отправляет post_save
+            CatalogVersion.bump()
+            catalog_cache.clear()
+            transaction.on_commit(invalidate_catalog)
+
 
-class SignUpViewSet(viewsets.GenericViewSet):
+class SignUpViewSet(RetryOnLockMixin, viewsets.GenericViewSet):
     """Регистрация и получение кода подтверждения"""
     permission_classes = (permissions.AllowAny,)
     serializer_class = SignUpSerializer
@@ -62,20 +105,22 @@ class SignUpViewSet(viewsets.GenericViewSet):
         username = serializer.data.get('username')
         email = serializer.data.get('email')
         try:
-            user, is_created = User.objects.get_or_create(username=username,
-                                                          email=email
-                                                          )
+            with transaction.atomic():
+                user, is_created = User.objects.get_or_create(
+                    username=username,
+                    email=email
+                )
+                confirmation_code = default_token_generator.make_token(user)
+                OutgoingEmail.objects.create(
+                    subject='Код подтверждения YaMDb',
+                    message=f'Ваш код подтверждения: {confirmation_code}',
+                    from_email=settings.ADMIN_EMAIL,
+                    recipient=user.email
+                )
         except IntegrityError:
             raise serializers.ValidationError(f'Что-то не так с'
                                               f' username: {username}'
                                               f' или email: {email}')
-        confirmation_code = default_token_generator.make_token(user)
-        send_mail(
-            subject='Код подтверждения YaMDb',
-            message=f'Ваш код подтверждения: {confirmation_code}',
-            from_email=settings.ADMIN_EMAIL,
-            recipient_list=(user.email,)
-        )
         return Response(serializer.data, status.HTTP_200_OK)
 
     @action(detail=False, methods=['POST'])
@@ -94,9 +139,8 @@ class SignUpViewSet(viewsets.GenericViewSet):
                         status=status.HTTP_200_OK)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(RetryOnLockMixin, viewsets.ModelViewSet):
     """Работа с юзерами"""
-    queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (AdminOnly,)
     pagination_class = PageNumberPagination
@@ -106,6 +150,21 @@ class UserViewSet(viewsets.ModelViewSet):
     lookup_field = 'username'
     http_method_names = ('get', 'post', 'patch', 'delete')
 
+    def get_queryset(self):
+        return User.objects.filter(is_active=True)
+
+    def perform_destroy(self, instance):
+        """Деактивируем пользователя: его отзывы и комментарии сразу
+        скрываются, а оценки уходят из рейтингов. Удаляет их фоновая задача
+        """
+        instance.is_active = False
+        instance.save(update_fields=('is_active',))
+        refresh_title_ratings(Review.objects.filter(
+            author=instance
+        ).exclude(title_id=None).values_list('title_id', flat=True))
+        transaction.on_commit(invalidate_catalog)
+        enqueue(purge_user, instance.pk)
+
     @action(detail=False, methods=['GET', 'PATCH'],
             permission_classes=(IsAuthenticated,))
     def me(self, request):
@@ -124,13 +183,17 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(RetryOnLockMixin, ReadReplicaMixin, StreamingListMixin,
+                   BulkCreateMixin, CachedResponseMixin,
+                   viewsets.ModelViewSet):
     """Представление модели Title."""
-    queryset = Title.objects.all()
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     serializer_class = TitleListSerializer
     pagination_class = ComplexObjectPagination
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, TitleOrderingFilter)
     filterset_class = TitleFilterSet
 
     def get_serializer_class(self):
@@ -138,21 +201,70 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleListSerializer
         return TitleCreateSerializer
 
+    def list(self, request, *args, **kwargs):
+        if self.use_stream(request):
+            return self.stream_list(request)
+        return self.get_cached_response(self.list_rows, request,
+                                        *args, **kwargs)
+
+    def list_rows(self, request, *args, **kwargs):
+        """Список без TitleListSerializer: тот же JSON собирается из
+        кортежей values_list и одного запроса жанров на страницу
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        # Жанры читаем из той же базы, что и страницу
+        queryset = queryset.using(queryset.db)
+        page = self.paginate_queryset(title_rows(queryset))
+        if page is not None:
+            return self.get_paginated_response(
+                fast_title_list(page, queryset.db)
+            )
+        return Response(fast_title_list(list(title_rows(queryset)),
+                                        queryset.db))
+
+    def get_stream_chunks(self, queryset):
+        for chunk in queryset_chunks(title_rows(queryset)):
+            yield fast_title_list(chunk, queryset.db)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request,
+                                        *args, **kwargs)
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
-        headers = self.get_success_headers(serializer.data)
-        output = TitleListSerializer(instance=Title.objects.last())
+        if self.is_bulk():
+            return Response(fast_title_list(list(title_rows(
+                Title.objects.filter(
+                    pk__in=[title.pk for title in serializer.instance]
+                ).order_by('id')
+            ))), status=status.HTTP_201_CREATED)
+        output = TitleListSerializer(instance=serializer.instance)
         return Response(
-            output.data, status=status.HTTP_201_CREATED, headers=headers
+            output.data, status=status.HTTP_201_CREATED,
+            headers=self.get_success_headers(output.data)
         )
 
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        if self.is_bulk():
+            # bulk_create не отправляет post_save и m2m_changed
+            transaction.on_commit(invalidate_catalog)
+
     def update(self, request, *args, **kwargs):
         super().update(request, *args, **kwargs)
         output = TitleListSerializer(instance=self.get_object())
         return Response(output.data)
 
+    def perform_destroy(self, instance):
+        """Произведение сразу скрывается, отзывы и комментарии
+        удаляет пачками фоновая задача
+        """
+        instance.soft_delete()
+        transaction.on_commit(invalidate_catalog)
+        enqueue(purge_title, instance.pk)
+
 
 class GenreViewSet(GenreCategoryViewSet):
     """Представление модели Genre."""
@@ -166,38 +278,103 @@ class CategoryViewSet(GenreCategoryViewSet):
     serializer_class = CategorySerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(RetryOnLockMixin, ReadReplicaMixin, NestedResourceMixin,
+                    viewsets.ModelViewSet):
     """Представление модели Review."""
     serializer_class = ReviewSerializer
-    pagination_class = ComplexObjectPagination
+    pagination_class = ReviewPagination
     permission_classes = (IsAdminOrAuthorOrModeratorOrReadOnly,)
     http_method_names = ('get', 'post', 'patch', 'delete')
 
+    parent_model = Title
+    parent_lookup = {'pk': 'title_id'}
+
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return Review.objects.filter(
+            title_id=self.kwargs.get('title_id'), title__is_deleted=False,
+            author__is_active=True
+        ).select_related('title', 'author')
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        serializer.save(author=self.request.user, title=title)
+        """Повторный отзыв отсекает уникальное ограничение в базе. Отзыв
+        ищем только после ошибки, чтобы другие нарушения целостности
+        не выдать за повторный отзыв
+        """
+        author, title = self.get_author(), self.get_parent()
+        try:
+            with transaction.atomic():
+                serializer.save(author=author, title=title)
+        except IntegrityError:
+            if not Review.objects.filter(author=author, title=title).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Вы не можете добавить более '
+                    'одного отзыва на произведение'
+                ]
+            })
 
     def perform_update(self, serializer):
-        super(ReviewViewSet, self).perform_update(serializer)
+        with transaction.atomic():
+            serializer.instance.refresh_rating_snapshot()
+            super(ReviewViewSet, self).perform_update(serializer)
 
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.refresh_rating_snapshot()
+            instance.soft_delete()
+            enqueue(purge_review, instance.pk)
+        transaction.on_commit(invalidate_catalog)
 
-class CommentViewSet(viewsets.ModelViewSet):
+
+class CommentViewSet(RetryOnLockMixin, ReadReplicaMixin, NestedResourceMixin,
+                     viewsets.ModelViewSet):
     """Представление модели Comment."""
     serializer_class = CommentSerializer
-    pagination_class = ComplexObjectPagination
+    pagination_class = CommentPagination
     permission_classes = (IsAdminOrAuthorOrModeratorOrReadOnly,)
 
+    parent_model = Review
+    parent_lookup = {'pk': 'review_id', 'title_id': 'title_id'}
+    parent_filter = {'title__is_deleted': False, 'author__is_active': True}
+
     def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        return review.comments.all()
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id'),
+            review__title__is_deleted=False, review__is_deleted=False,
+            review__author__is_active=True, author__is_active=True
+        ).select_related('review', 'author')
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id, title=title_id)
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.get_author(), review=self.get_parent())
+
+
+class CatalogExportView(APIView):
+    """Выгрузка всего каталога в gzip для партнёров, только для админа.
+    Файл отдаётся потоком, прерванную выгрузку продолжают с ?after_id
+    """
+    permission_classes = (AdminOnly,)
+
+    def get(self, request):
+        params = CatalogExportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        output = params.validated_data['output']
+        response = StreamingHttpResponse(
+            gzip_chunks(export_catalog(**params.validated_data)),
+            content_type='application/gzip'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="catalog.{output}.gz"'
+        )
+        return response
+
+
+class MetricsView(APIView):
+    """Метрики эндпоинтов в формате Prometheus, только для админа"""
+    permission_classes = (AdminOnly,)
+    renderer_classes = (PrometheusRenderer,)
+
+    def get(self, request):
+        return Response(render_prometheus(registry.collect()),
+                        content_type='text/plain; version=0.0.4')
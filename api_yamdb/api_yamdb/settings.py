@@ -30,10 +30,12 @@ INSTALLED_APPS = [
     'titles.apps.TitlesConfig',
     'users.apps.UsersConfig',
     'reviews.apps.ReviewsConfig',
+    'tasks.apps.TasksConfig',
     'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -68,10 +70,60 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# Сколько строк удаляет за одну транзакцию фоновая очистка
+PURGE_CHUNK_SIZE = 500
+
+# Объектов в одной пачке потокового ответа ?stream=true
+STREAM_CHUNK_SIZE = 500
+# Наибольший список в одном POST на создание произведений, жанров
+# и категорий
+BULK_CREATE_MAX_ITEMS = 1000
+
+# Прагмы для каждого нового соединения с SQLite, см. settings_prod
+SQLITE_PRAGMAS = {}
+DB_LOCK_RETRIES = 5
+DB_LOCK_BACKOFF = 0.05
+
+# Реплики для чтения: пути к копиям базы через запятую, их обновляет
+# команда sync_replicas
+READ_REPLICAS = []
+for number, name in enumerate(filter(None,
+                                     os.getenv('DB_REPLICAS', '').split(','))):
+    DATABASES[f'replica_{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+        'TEST': {'MIRROR': 'default'},
+    }
+    READ_REPLICAS.append(f'replica_{number}')
+DATABASE_ROUTERS = ('api.db.ReplicaRouter',)
+# Сколько секунд после записи пользователь читает из основной базы
+REPLICA_STICKY_SECONDS = 10
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'yamdb'),
+    }
+}
+
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = 60 * 15
+AUTH_STATE_CACHE_TIMEOUT = 60
+# Как часто воркер сверяет свой кэш жанров и категорий с версией в базе
+CATALOG_CACHE_CHECK_INTERVAL = 1
+
+# Потоки пула, в котором асинхронные эндпоинты обращаются к базе
+ASYNC_READ_THREADS = int(os.getenv('ASYNC_READ_THREADS', 8))
+
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_DUMP_INTERVAL = 10
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -108,7 +160,11 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated', ],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ),
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
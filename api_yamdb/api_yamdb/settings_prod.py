@@ -0,0 +1,38 @@
+"""Настройки для продакшена: DJANGO_SETTINGS_MODULE=api_yamdb.settings_prod"""
+import copy
+import os
+
+from .settings import *  # noqa: F401, F403
+from .settings import BASE_DIR, DATABASES as BASE_DATABASES
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', '*').split(',')
+
+# Соединения живут между запросами, прагмы выполняются один раз
+DATABASES = copy.deepcopy(BASE_DATABASES)
+DATABASES['default']['CONN_MAX_AGE'] = 600
+
+# Права пользователей из токенов, версия каталога и закреплённые за основной
+# базой клиенты должны быть общими для всех воркеров: locmem не подходит
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', BASE_DIR / '.cache'),
+    }
+}
+
+SQLITE_PRAGMAS = {
+    # Читатели не блокируют писателя и друг друга
+    'journal_mode': 'WAL',
+    # В режиме WAL не теряет данные при падении процесса
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение задаёт размер кэша в килобайтах
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,
+}
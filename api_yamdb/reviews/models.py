@@ -1,7 +1,8 @@
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
+from django.db.models import F
 
-from titles.models import Title
+from titles.models import Title, VisibleManager
 from users.models import User
 
 
@@ -30,19 +31,77 @@ class Review(models.Model):
         auto_now_add=True,
         verbose_name='Дата добавления'
     )
+    is_deleted = models.BooleanField(
+        verbose_name='Удалён',
+        default=False,
+        editable=False
+    )
+
+    objects = VisibleManager()
+    all_objects = models.Manager()
 
     class Meta:
         constraints = [
+            # Автор может написать новый отзыв, пока старый ждёт удаления
             models.UniqueConstraint(
                 fields=['title', 'author'],
+                condition=models.Q(is_deleted=False),
                 name='unique_author_review'
             )
         ]
-        ordering = ('-pub_date',)
+        # Список отзывов произведения выбирается по индексу без сортировки
+        indexes = (
+            models.Index(fields=('title', 'pub_date', 'id'),
+                         name='review_title_pub_date_idx'),
+        )
+        ordering = ('-pub_date', '-id')
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         default_related_name = 'reviews'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Сохраняем загруженные из базы оценку и произведение,
+        чтобы при изменении отзыва пересчитать рейтинг по разнице
+        """
+        instance = super().from_db(db, field_names, values)
+        if 'score' in instance.__dict__ and 'title_id' in instance.__dict__:
+            instance._loaded_title_id = instance.title_id
+            instance._loaded_score = instance.score
+        return instance
+
+    def refresh_rating_snapshot(self):
+        """Перечитываем оценку и произведение внутри транзакции,
+        чтобы разница для рейтинга считалась от актуальных значений.
+        Пустой UPDATE через F() сразу берёт блокировку на запись: в SQLite
+        писатель один, в других базах блокируется строка отзыва. Поэтому
+        прочитанная следом оценка не изменится до конца транзакции, а
+        запрос, не получивший блокировку, повторит RetryOnLockMixin.
+        select_for_update() в SQLite ничего не блокирует
+        """
+        Review.objects.filter(pk=self.pk).update(score=F('score'))
+        loaded = Review.objects.filter(pk=self.pk).values(
+            'title_id', 'score'
+        ).first()
+        if loaded:
+            self._loaded_title_id = loaded['title_id']
+            self._loaded_score = loaded['score']
+
+    def soft_delete(self):
+        """Скрываем отзыв и сразу исключаем его оценку из рейтинга,
+        физически его удалит фоновая задача
+        """
+        hidden = Review.all_objects.filter(
+            pk=self.pk, is_deleted=False
+        ).update(is_deleted=True)
+        self.is_deleted = True
+        title_id = getattr(self, '_loaded_title_id', self.title_id)
+        if hidden and title_id is not None:
+            Title.update_rating(
+                title_id, -getattr(self, '_loaded_score', self.score), -1
+            )
+        return hidden
+
     def __str__(self):
         return f'{self.text}'
 
@@ -68,7 +127,11 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
-        ordering = ['pub_date']
+        ordering = ['pub_date', 'id']
+        indexes = (
+            models.Index(fields=('review', 'pub_date', 'id'),
+                         name='comment_review_pub_date_idx'),
+        )
         default_related_name = 'comments'
 
     def __str__(self):
@@ -0,0 +1,47 @@
+from django.db.models import (Count, FloatField, OuterRef, Subquery,
+                              Sum)
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from reviews.models import Review
+from titles.models import Title
+
+
+def get_rating_aggregates(reviews):
+    """Сумма и количество оценок по произведениям одним GROUP BY"""
+    return {
+        row['title_id']: (row['score_sum'], row['review_count'])
+        for row in reviews.values('title_id').annotate(
+            score_sum=Sum('score'), review_count=Count('id')
+        ).order_by()
+    }
+
+
+def get_rating(score_sum, review_count):
+    return score_sum / review_count if review_count else None
+
+
+def refresh_title_ratings(title_ids, chunk_size=500):
+    """Пересчитывает сохранённый рейтинг произведений по отзывам
+    активных пользователей. Сумма и количество оценок считаются
+    коррелированными подзапросами в том же UPDATE, поэтому отзыв,
+    сохранённый между сверкой и записью, не будет перезаписан
+    устаревшими значениями
+    """
+    reviews = Review.objects.filter(
+        title_id=OuterRef('pk'), author__is_active=True
+    ).order_by().values('title_id')
+    score_sum = Coalesce(Subquery(
+        reviews.annotate(total=Sum('score')).values('total')
+    ), 0)
+    review_count = Coalesce(Subquery(
+        reviews.annotate(total=Count('id')).values('total')
+    ), 0)
+    title_ids = sorted(title_ids)
+    for start in range(0, len(title_ids), chunk_size):
+        Title.objects.filter(
+            pk__in=title_ids[start:start + chunk_size]
+        ).update(
+            score_sum=score_sum,
+            review_count=review_count,
+            rating=Cast(score_sum, FloatField()) / NullIf(review_count, 0)
+        )
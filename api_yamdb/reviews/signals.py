@@ -0,0 +1,54 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from reviews.models import Review
+from titles.models import Title
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    """Запоминаем сохранённые в базе оценку и произведение отзыва,
+    если объект был создан не через загрузку из базы
+    """
+    if instance.pk is None or hasattr(instance, '_loaded_score'):
+        return
+    loaded = Review.objects.filter(pk=instance.pk).values(
+        'title_id', 'score'
+    ).first()
+    if loaded:
+        instance._loaded_title_id = loaded['title_id']
+        instance._loaded_score = loaded['score']
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    """Учитываем новую или изменённую оценку в рейтинге произведения"""
+    old_title_id = getattr(instance, '_loaded_title_id', None)
+    old_score = getattr(instance, '_loaded_score', None)
+    if created or old_score is None:
+        if instance.title_id is not None:
+            Title.update_rating(instance.title_id, instance.score, 1)
+    elif old_title_id != instance.title_id:
+        if old_title_id is not None:
+            Title.update_rating(old_title_id, -old_score, -1)
+        if instance.title_id is not None:
+            Title.update_rating(instance.title_id, instance.score, 1)
+    elif old_score != instance.score and instance.title_id is not None:
+        Title.update_rating(instance.title_id,
+                            instance.score - old_score, 0)
+    instance._loaded_title_id = instance.title_id
+    instance._loaded_score = instance.score
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Исключаем оценку удалённого отзыва из рейтинга произведения.
+    Оценка скрытого отзыва исключена ещё при его скрытии
+    """
+    if instance.is_deleted:
+        return
+    title_id = getattr(instance, '_loaded_title_id', instance.title_id)
+    if title_id is not None:
+        Title.update_rating(
+            title_id, -getattr(instance, '_loaded_score', instance.score), -1
+        )
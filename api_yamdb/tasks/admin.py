@@ -0,0 +1,19 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'created_at',
+                    'finished_at', 'duration')
+    list_filter = ('status', 'name')
+    actions = ('requeue',)
+
+    @admin.action(description='Поставить в очередь заново')
+    def requeue(self, request, queryset):
+        queryset.exclude(status=Task.RUNNING).update(
+            status=Task.PENDING, attempts=0, run_at=timezone.now(),
+            last_error=''
+        )
@@ -0,0 +1,57 @@
+import time
+import traceback
+
+from django.db.models import F
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.queue import registry
+from tasks.worker import QueueWorkerCommand
+
+
+class Command(QueueWorkerCommand):
+    help = ('Run queued background tasks. Every thread claims a batch, runs '
+            'it and retries failures with backoff. Several workers, in '
+            'threads or separate processes, may share one queue.')
+    model = Task
+    running_status = Task.RUNNING
+    ready_field = 'run_at'
+    result_message = 'Ran {} tasks'
+
+    def get_claim_updates(self):
+        return {'attempts': F('attempts') + 1}
+
+    def process(self, batch):
+        return sum(self.run(claimed) for claimed in batch)
+
+    def run(self, claimed):
+        func = registry.get(claimed.name)
+        started = time.perf_counter()
+        try:
+            if func is None:
+                raise LookupError(f'Unknown task: {claimed.name}')
+            func(*claimed.args, **claimed.kwargs)
+        except Exception as error:
+            claimed.duration = time.perf_counter() - started
+            self.fail(claimed, error, retry=func is not None)
+            return 0
+        claimed.duration = time.perf_counter() - started
+        claimed.status = Task.DONE
+        claimed.finished_at = timezone.now()
+        self.save(claimed, ('status', 'finished_at', 'duration'))
+        self.stdout.write(f'{claimed}: {claimed.duration:.3f}s')
+        return 1
+
+    def fail(self, claimed, error, retry=True):
+        claimed.last_error = ''.join(traceback.format_exception(
+            type(error), error, error.__traceback__
+        ))
+        if not retry or claimed.attempts >= claimed.max_attempts:
+            claimed.status = Task.DEAD
+            claimed.finished_at = timezone.now()
+        else:
+            claimed.status = Task.PENDING
+            claimed.run_at = self.get_retry_at(claimed.attempts)
+        self.save(claimed, ('last_error', 'status', 'run_at', 'finished_at',
+                            'duration'))
+        self.stderr.write(f'{claimed}: {type(error).__name__}: {error}')
@@ -0,0 +1,78 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """Отложенная задача. Запрос только ставит её в очередь,
+    выполняет команда run_worker
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    DEAD = 'dead'
+    STATUSES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (DEAD, 'Не выполнена'),
+    )
+
+    name = models.CharField(verbose_name='Задача', max_length=255)
+    args = models.JSONField(verbose_name='Аргументы', default=list)
+    kwargs = models.JSONField(verbose_name='Именованные аргументы',
+                              default=dict)
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=max(len(status) for status, _ in STATUSES),
+        choices=STATUSES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток',
+        default=0
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name='Максимум попыток',
+        default=5
+    )
+    run_at = models.DateTimeField(
+        verbose_name='Запустить не раньше',
+        default=timezone.now
+    )
+    claimed_by = models.CharField(
+        verbose_name='Воркер',
+        max_length=64,
+        blank=True
+    )
+    claimed_at = models.DateTimeField(
+        verbose_name='Взята в работу',
+        null=True,
+        blank=True
+    )
+    last_error = models.TextField(verbose_name='Последняя ошибка', blank=True)
+    created_at = models.DateTimeField(
+        verbose_name='Создана',
+        auto_now_add=True
+    )
+    finished_at = models.DateTimeField(
+        verbose_name='Завершена',
+        null=True,
+        blank=True
+    )
+    duration = models.FloatField(
+        verbose_name='Время выполнения, с',
+        null=True,
+        blank=True
+    )
+
+    class Meta:
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        ordering = ('id',)
+        indexes = (
+            models.Index(fields=('status', 'run_at'),
+                         name='task_queue_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.name} [{self.status}]'
@@ -0,0 +1,31 @@
+from django.utils import timezone
+
+registry = {}
+
+
+def task(func):
+    """Регистрирует функцию как фоновую задачу под именем
+    модуль.функция. Аргументы задачи должны сериализоваться в JSON
+    """
+    name = f'{func.__module__}.{func.__name__}'
+    registry[name] = func
+    func.task_name = name
+    return func
+
+
+def enqueue(func, *args, run_at=None, max_attempts=None, **kwargs):
+    """Ставит задачу в очередь. Внутри транзакции задача станет видна
+    воркерам только после её фиксации
+    """
+    from .models import Task
+
+    name = getattr(func, 'task_name', func)
+    if name not in registry:
+        raise KeyError(f'Unknown task: {name}')
+    fields = {}
+    if max_attempts is not None:
+        fields['max_attempts'] = max_attempts
+    return Task.objects.create(
+        name=name, args=list(args), kwargs=kwargs,
+        run_at=run_at or timezone.now(), **fields
+    )
@@ -0,0 +1,137 @@
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import (OperationalError, close_old_connections, connection,
+                       transaction)
+from django.db.models import Q
+from django.utils import timezone
+
+from api.db import is_locked
+
+
+class QueueWorkerCommand(BaseCommand):
+    """Общий цикл воркеров очередей в базе: потоки забирают пачки строк,
+    обрабатывают их и сохраняют результат с повторами на блокировке.
+    У модели очереди должны быть поля status, claimed_by, claimed_at,
+    attempts и поле времени следующей попытки ready_field. Наследник
+    задаёт process(batch), который возвращает число обработанных строк
+    """
+    model = None
+    running_status = None
+    ready_field = None
+    batch_size = 10
+    backoff = 10
+    claim_timeout = 600
+    result_message = 'Processed {} items'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--batch-size', type=int,
+                            default=self.batch_size)
+        parser.add_argument('--backoff', type=float, default=self.backoff,
+                            help='Delay before the first retry, seconds. '
+                                 'Doubles after each failed attempt.')
+        parser.add_argument('--claim-timeout', type=float,
+                            default=self.claim_timeout,
+                            help='Reclaim items of crashed workers after '
+                                 'this many seconds.')
+        parser.add_argument('--poll-interval', type=float, default=1)
+        parser.add_argument('--once', action='store_true',
+                            help='Exit when the queue is empty.')
+
+    def handle(self, *args, **options):
+        self.options = options
+        if options['threads'] == 1:
+            done = self.work()
+        else:
+            with ThreadPoolExecutor(options['threads']) as executor:
+                futures = [executor.submit(self.work_in_thread)
+                           for _ in range(options['threads'])]
+                done = sum(future.result() for future in futures)
+        self.stdout.write(self.result_message.format(done))
+
+    def work(self):
+        """Цикл одного потока: берём пачку, пока очередь не пуста"""
+        worker = uuid.uuid4().hex
+        done = 0
+        while True:
+            try:
+                batch = self.claim(worker)
+            except OperationalError as error:
+                # Очередь занята другим воркером, попробуем чуть позже
+                if not is_locked(error):
+                    raise
+                time.sleep(random.uniform(0.01, 0.1))
+                continue
+            if batch:
+                done += self.process(batch)
+            elif self.options['once']:
+                return done
+            else:
+                time.sleep(self.options['poll_interval'])
+            close_old_connections()
+
+    def work_in_thread(self):
+        try:
+            return self.work()
+        finally:
+            connection.close()
+
+    def get_claim_updates(self):
+        """Дополнительные поля, которые меняет UPDATE захвата"""
+        return {}
+
+    def claim(self, worker):
+        """Забираем пачку одним условным UPDATE с подзапросом. Условие
+        готовности повторяется в самом UPDATE, поэтому строку, которую
+        уже захватил другой воркер, он не перезапишет: на этом и держится
+        гарантия, что строка достанется одному воркеру. В SQLite
+        select_for_update(skip_locked=True) ничего не делает, в других
+        базах он лишь избавляет воркеры от ожидания чужих блокировок
+        """
+        now = timezone.now()
+        stale = now - timedelta(seconds=self.options['claim_timeout'])
+        ready = (
+            Q(status=self.model.PENDING, **{f'{self.ready_field}__lte': now})
+            | Q(status=self.running_status, claimed_at__lt=stale)
+        )
+        queryset = self.model.objects
+        with transaction.atomic():
+            ids = queryset.filter(ready).order_by(
+                self.ready_field, 'id'
+            ).select_for_update(skip_locked=True).values('id')[
+                :self.options['batch_size']
+            ]
+            claimed = queryset.filter(ready, id__in=ids).update(
+                status=self.running_status, claimed_by=worker,
+                claimed_at=now, **self.get_claim_updates()
+            )
+            if not claimed:
+                return []
+            # Пачку читаем в той же транзакции: если чтение упадёт на
+            # блокировке, строки не останутся захваченными без обработки
+            return list(queryset.filter(
+                claimed_by=worker, claimed_at=now, status=self.running_status
+            ))
+
+    def get_retry_at(self, attempts):
+        return timezone.now() + timedelta(
+            seconds=self.options['backoff'] * 2 ** (attempts - 1)
+        )
+
+    def save(self, instance, fields, retries=10):
+        """Результат не должен потеряться из-за занятой базы, иначе
+        строку повторно обработает другой воркер
+        """
+        for attempt in range(retries):
+            try:
+                instance.save(update_fields=fields)
+                return
+            except OperationalError as error:
+                if not is_locked(error) or attempt == retries - 1:
+                    raise
+            time.sleep(random.uniform(0.01, 0.1) * 2 ** attempt)
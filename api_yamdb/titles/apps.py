@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def install_title_search(sender, using, **kwargs):
+    from django.db import connections
+
+    from titles.search import install_search
+    install_search(connections[using])
 
 
 class TitlesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'titles'
+
+    def ready(self):
+        import titles.signals  # noqa: F401
+        post_migrate.connect(install_title_search, sender=self)
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from titles.models import CatalogVersion, Category, Genre
+
+
+class CatalogCache:
+    """Жанры и категории в памяти процесса, по slug и по id.
+    Версия из базы проверяется не чаще CATALOG_CACHE_CHECK_INTERVAL.
+    Если slug не найден, кэш перечитывается целиком: bulk_create в других
+    процессах мог не увеличить версию
+    """
+    models = (Genre, Category)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.version = None
+            self.checked_at = 0.0
+            self.by_slug = {}
+            self.by_id = {}
+
+    def load(self, force=False):
+        with self.lock:
+            now = time.monotonic()
+            if (not force and self.version is not None
+                    and now - self.checked_at
+                    < settings.CATALOG_CACHE_CHECK_INTERVAL):
+                return
+            version = CatalogVersion.get_current()
+            if force or version != self.version:
+                by_slug, by_id = {}, {}
+                for model in self.models:
+                    objects = list(model.objects.using(DEFAULT_DB_ALIAS))
+                    by_slug[model] = {obj.slug: obj for obj in objects}
+                    by_id[model] = {obj.pk: obj for obj in objects}
+                self.by_slug, self.by_id = by_slug, by_id
+                self.version = version
+            self.checked_at = now
+
+    def get_by_slug(self, model, slug):
+        self.load()
+        # Словари мог сбросить clear() из сигнала в другом потоке
+        obj = self.by_slug.get(model, {}).get(slug)
+        if obj is None:
+            # Объект мог появиться в другом воркере, даже без новой версии
+            self.load(force=True)
+            obj = self.by_slug.get(model, {}).get(slug)
+        return obj
+
+    def get_by_id(self, model, pk):
+        self.load()
+        obj = self.by_id.get(model, {}).get(pk)
+        if obj is None:
+            self.load(force=True)
+            obj = self.by_id.get(model, {}).get(pk)
+        return obj
+
+
+catalog_cache = CatalogCache()
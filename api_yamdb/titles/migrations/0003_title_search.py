@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from titles.search import install_search, rebuild_search_index, uninstall_search
+
+
+def create_search_index(apps, schema_editor):
+    install_search(schema_editor.connection)
+    rebuild_search_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    uninstall_search(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titles', '0002_title_rating'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
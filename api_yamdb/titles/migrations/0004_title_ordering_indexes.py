@@ -0,0 +1,35 @@
+# Generated by Django 3.2 on 2026-10-18 17:25
+
+from django.db import migrations, models
+import utlis.validators
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titles', '0003_title_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='title',
+            name='year',
+            field=models.PositiveIntegerField(validators=[utlis.validators.validate_year], verbose_name='Год создания'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating', 'id'], name='title_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', 'id'], name='title_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['review_count', 'id'], name='title_review_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['name', 'id'], name='title_name_idx'),
+        ),
+    ]
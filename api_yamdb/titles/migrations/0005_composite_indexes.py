@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-18 17:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titles', '0004_title_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='genretitle',
+            index=models.Index(fields=['genre', 'title'], name='genretitle_genre_title_idx'),
+        ),
+        # Фильтр произведений по жанру читает только индекс связующей таблицы
+        migrations.RunSQL(
+            'CREATE INDEX titles_title_genre_genre_title_idx '
+            'ON titles_title_genre (genre_id, title_id)',
+            'DROP INDEX titles_title_genre_genre_title_idx',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titles', '0006_catalog_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='is_deleted',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Удалено'),
+        ),
+    ]
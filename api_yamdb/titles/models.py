@@ -1,9 +1,20 @@
 from django.db import models
+from django.db.models import (Case, ExpressionWrapper, F, FloatField,
+                              Value, When)
+from django.db.models.functions import Cast
 
 from utlis.validators import validate_year
 from api_yamdb.settings import NAME_MAX_LENGTH, SLUG_MAX_LENGTH
 
 
+class VisibleManager(models.Manager):
+    """Объекты, не помеченные на удаление. Каскадное удаление
+    и обращения по внешнему ключу идут через базовый менеджер
+    """
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
 class Title(models.Model):
     """Модель произведений, к которым пишут отзывы"""
     name = models.CharField(
@@ -12,8 +23,7 @@ class Title(models.Model):
     )
     year = models.PositiveIntegerField(
         verbose_name='Год создания',
-        validators=(validate_year,),
-        db_index=True
+        validators=(validate_year,)
     )
     description = models.TextField(
         verbose_name='Описание',
@@ -28,13 +38,75 @@ class Title(models.Model):
         null=True,
         on_delete=models.SET_NULL
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False
+    )
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False
+    )
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    is_deleted = models.BooleanField(
+        verbose_name='Удалено',
+        default=False,
+        editable=False
+    )
+
+    objects = VisibleManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ('id',)
+        # Индексы под сортировки и фильтры списка произведений
+        indexes = (
+            models.Index(fields=('rating', 'id'), name='title_rating_idx'),
+            models.Index(fields=('year', 'id'), name='title_year_idx'),
+            models.Index(fields=('review_count', 'id'),
+                         name='title_review_count_idx'),
+            models.Index(fields=('name', 'id'), name='title_name_idx'),
+        )
         default_related_name = 'titles'
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
 
+    @classmethod
+    def update_rating(cls, pk, score_delta, count_delta):
+        """Изменяем сумму и количество оценок произведения на дельту
+        одним UPDATE, пересчитывая рейтинг на стороне базы данных
+        """
+        new_sum = F('score_sum') + score_delta
+        new_count = F('review_count') + count_delta
+        return cls.objects.filter(pk=pk).update(
+            score_sum=new_sum,
+            review_count=new_count,
+            rating=Case(
+                When(
+                    review_count__gt=-count_delta,
+                    then=ExpressionWrapper(
+                        Cast(new_sum, FloatField()) / new_count,
+                        output_field=FloatField()
+                    )
+                ),
+                default=Value(None),
+                output_field=FloatField()
+            )
+        )
+
+    def soft_delete(self):
+        """Скрываем произведение, физически его удалит фоновая задача"""
+        self.is_deleted = True
+        return Title.all_objects.filter(
+            pk=self.pk, is_deleted=False
+        ).update(is_deleted=True)
+
     def get_genres(self):
         """Получаем названия жанров для отображения их в админ панели"""
         return '\n'.join([g.name for g in self.genre.all()])
@@ -67,6 +139,12 @@ class GenreTitle(models.Model):
     genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
     title = models.ForeignKey(Title, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = (
+            models.Index(fields=('genre', 'title'),
+                         name='genretitle_genre_title_idx'),
+        )
+
     def __str__(self):
         return f'{self.genre} {self.title}'
 
@@ -89,3 +167,25 @@ class Category(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class CatalogVersion(models.Model):
+    """Счётчик изменений жанров и категорий. Воркеры сравнивают его
+    со своей версией, чтобы сбросить локальный кэш каталога
+    """
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Версия каталога'
+        verbose_name_plural = 'Версии каталога'
+
+    @classmethod
+    def get_current(cls):
+        return cls.objects.filter(pk=1).values_list(
+            'version', flat=True
+        ).first() or 0
+
+    @classmethod
+    def bump(cls):
+        if not cls.objects.filter(pk=1).update(version=F('version') + 1):
+            cls.objects.get_or_create(pk=1, defaults={'version': 1})
@@ -0,0 +1,120 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+SEARCH_TABLE = 'titles_title_fts'
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+TOKEN_REGEX = re.compile(r'\w+')
+
+CREATE_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    name, description,
+    content='titles_title', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+)
+"""
+# Триггеры держат индекс в синхронизации с таблицей произведений при
+# любой записи, в том числе bulk_create и update() в обход сигналов
+CREATE_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert
+    AFTER INSERT ON titles_title BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete
+    AFTER DELETE ON titles_title BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_update
+    AFTER UPDATE OF name, description ON titles_title BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+)
+DROP_STATEMENTS = (
+    f'DROP TRIGGER IF EXISTS {SEARCH_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {SEARCH_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {SEARCH_TABLE}_update',
+    f'DROP TABLE IF EXISTS {SEARCH_TABLE}',
+)
+
+
+def is_supported(connection):
+    return connection.vendor == 'sqlite'
+
+
+def install_search(connection):
+    """Создаёт полнотекстовый индекс и триггеры, если их ещё нет.
+    SQLite пересоздаёт таблицу при изменении схемы в миграциях и теряет
+    триггеры, поэтому вызывается и после каждого migrate
+    """
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE)
+        for statement in CREATE_TRIGGERS:
+            cursor.execute(statement)
+
+
+def uninstall_search(connection):
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        for statement in DROP_STATEMENTS:
+            cursor.execute(statement)
+
+
+def rebuild_search_index(connection):
+    """Полностью перестраивает индекс по таблице произведений"""
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"
+        )
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"
+        )
+
+
+def build_match_query(text):
+    """Каждое слово запроса ищется по префиксу, все слова обязательны"""
+    return ' '.join(
+        '"{}"*'.format(token) for token in TOKEN_REGEX.findall(text)
+    )
+
+
+def search_titles(queryset, text):
+    """Отбирает произведения по запросу и сортирует их по BM25"""
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    if not is_supported(connections[queryset.db]):
+        query = Q()
+        for token in TOKEN_REGEX.findall(text):
+            query &= Q(name__icontains=token) | Q(
+                description__icontains=token
+            )
+        return queryset.filter(query)
+    return queryset.extra(
+        tables=(SEARCH_TABLE,),
+        where=(
+            f'{SEARCH_TABLE}.rowid = titles_title.id',
+            f'{SEARCH_TABLE} MATCH %s',
+        ),
+        params=(match,),
+        select={'search_rank': f'bm25({SEARCH_TABLE}, %s, %s)'},
+        select_params=(NAME_WEIGHT, DESCRIPTION_WEIGHT),
+        order_by=('search_rank', 'id'),
+    )
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from titles.catalog import catalog_cache
+from titles.models import CatalogVersion, Category, Genre
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_catalog_version(sender, **kwargs):
+    """Изменение жанров и категорий, в том числе через админку,
+    сбрасывает кэш каталога в этом и остальных воркерах
+    """
+    CatalogVersion.bump()
+    catalog_cache.clear()
@@ -1,4 +1,14 @@
 from django.contrib import admin
-from .models import User
+from .models import OutgoingEmail, User
 
 admin.site.register(User)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'status', 'attempts',
+                    'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('recipient',)
+    # Текст письма содержит код подтверждения
+    exclude = ('message',)
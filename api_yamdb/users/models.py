@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 from api_yamdb.settings import EMAIL_MAX_LENGTH
 
@@ -50,3 +51,77 @@ class User(AbstractUser):
     @property
     def is_user(self):
         return self.role == self.USER
+
+
+class OutgoingEmail(models.Model):
+    """Очередь исходящих писем. Запрос только записывает письмо,
+    отправкой занимается команда send_emails. В тексте коды
+    подтверждения, поэтому после отправки он стирается
+    """
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает отправки'),
+        (SENDING, 'Отправляется'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    subject = models.CharField(verbose_name='Тема', max_length=255)
+    message = models.TextField(verbose_name='Текст')
+    from_email = models.EmailField(
+        verbose_name='Отправитель',
+        max_length=EMAIL_MAX_LENGTH
+    )
+    recipient = models.EmailField(
+        verbose_name='Получатель',
+        max_length=EMAIL_MAX_LENGTH
+    )
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=max(len(status) for status, _ in STATUSES),
+        choices=STATUSES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток отправки',
+        default=0
+    )
+    next_attempt_at = models.DateTimeField(
+        verbose_name='Следующая попытка',
+        default=timezone.now
+    )
+    claimed_by = models.CharField(
+        verbose_name='Воркер',
+        max_length=64,
+        blank=True
+    )
+    claimed_at = models.DateTimeField(
+        verbose_name='Взято в отправку',
+        null=True,
+        blank=True
+    )
+    last_error = models.TextField(verbose_name='Последняя ошибка', blank=True)
+    created_at = models.DateTimeField(
+        verbose_name='Создано',
+        auto_now_add=True
+    )
+    sent_at = models.DateTimeField(
+        verbose_name='Отправлено',
+        null=True,
+        blank=True
+    )
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('id',)
+        indexes = (
+            models.Index(fields=('status', 'next_attempt_at'),
+                         name='outgoing_email_queue_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
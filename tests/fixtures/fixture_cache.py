@@ -0,0 +1,12 @@
+import pytest
+from django.core.cache import caches
+
+from titles.catalog import catalog_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+    catalog_cache.clear()
+    yield
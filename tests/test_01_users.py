@@ -1,6 +1,8 @@
 from http import HTTPStatus
+from io import StringIO
 
 import pytest
+from django.core.management import call_command
 
 from tests.utils import (check_pagination,
                          invalid_data_for_user_patch_and_creation)
@@ -415,6 +417,8 @@ class Test01UserAPI:
             'Проверьте, что DELETE-запрос администратора к '
             '`/api/v1/users/{username}/` возвращает ответ со статусом 204.'
         )
+        # Пользователя удаляет фоновая задача
+        call_command('run_worker', once=True, threads=1, stdout=StringIO())
         assert django_user_model.objects.count() == (users_cnt - 1), (
             'Проверьте, что DELETE-запрос администратора к '
             '`/api/v1/users/{username}/` удаляет пользователя.'
@@ -456,6 +460,8 @@ class Test01UserAPI:
             'Проверьте, что DELETE-запрос суперпользователя к '
             '`/api/v1/users/{username}/` возвращает ответ со статусом 204.'
         )
+        # Пользователя удаляет фоновая задача
+        call_command('run_worker', once=True, threads=1, stdout=StringIO())
         assert django_user_model.objects.count() == (users_cnt - 1), (
             'Проверьте, что DELETE-запрос суперпользователя к '
             '`/api/v1/users/{username}/` удаляет пользователя.'
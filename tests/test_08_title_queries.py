@@ -0,0 +1,44 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleQueries:
+
+    def get_query_count(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        return len(context.captured_queries)
+
+    def test_01_title_list_query_count_is_constant(self, admin_client,
+                                                   client):
+        url = '/api/v1/titles/'
+        titles, _, _ = create_titles(admin_client)
+        queries_for_two = self.get_query_count(client, url)
+        for idx in range(3):
+            data = titles[0].copy()
+            data['name'] = f'{data["name"]} {idx}'
+            data.pop('id')
+            admin_client.post(url, data=data)
+        queries_for_five = self.get_query_count(client, url)
+        assert queries_for_two == queries_for_five, (
+            f'Проверьте, что количество запросов к базе данных при GET-запросе '
+            f'к `{url}` не зависит от количества произведений на странице.'
+        )
+        assert queries_for_five <= 3, (
+            f'Проверьте, что GET-запрос к `{url}` выполняет не больше трёх '
+            'запросов к базе данных: подсчёт, произведения с категориями и '
+            'жанры.'
+        )
+
+    def test_02_title_detail_query_count(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert self.get_query_count(client, url) <= 2, (
+            f'Проверьте, что GET-запрос к `{url}` получает произведение '
+            'вместе с категорией и жанрами не больше чем за два запроса.'
+        )
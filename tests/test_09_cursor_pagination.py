@@ -0,0 +1,67 @@
+import pytest
+
+from reviews.models import Comment, Review
+from titles.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CursorPagination:
+
+    def collect_pages(self, client, url):
+        results = []
+        response = client.get(url, {'pagination': 'cursor'})
+        while True:
+            assert response.status_code == 200
+            data = response.json()
+            assert 'count' not in data, (
+                f'Проверьте, что курсорная пагинация `{url}` не выполняет '
+                'подсчёт объектов.'
+            )
+            results.extend(data['results'])
+            if not data['next']:
+                return results
+            response = client.get(data['next'])
+
+    def test_01_review_cursor_pagination(self, client, django_user_model):
+        title = Title.objects.create(name='Title', year=2000)
+        for idx in range(12):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text=f'review {idx}', score=5
+            )
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        results = self.collect_pages(client, url)
+        expected = list(
+            Review.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )
+        )
+        assert [review['id'] for review in results] == expected, (
+            f'Проверьте, что курсорная пагинация `{url}` возвращает все '
+            'отзывы по одному разу в порядке убывания даты публикации.'
+        )
+        data = client.get(url).json()
+        assert data['count'] == 12, (
+            f'Проверьте, что без параметра `pagination` эндпоинт `{url}` '
+            'использует постраничную пагинацию.'
+        )
+
+    def test_02_comment_cursor_pagination(self, client, user):
+        title = Title.objects.create(name='Title', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='review', score=5
+        )
+        for idx in range(7):
+            Comment.objects.create(
+                review=review, author=user, text=f'comment {idx}'
+            )
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        results = self.collect_pages(client, url)
+        assert [comment['text'] for comment in results] == [
+            f'comment {idx}' for idx in range(7)
+        ], (
+            f'Проверьте, что курсорная пагинация `{url}` возвращает все '
+            'комментарии по одному разу в порядке публикации.'
+        )
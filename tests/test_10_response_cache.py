@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import transaction
+
+from api.cache import get_catalog_version
+
+from titles.models import Genre
+from tests.utils import create_genre, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10ResponseCache:
+
+    def test_01_etag_and_not_modified(self, admin_client, client):
+        create_titles(admin_client)
+        for url in ('/api/v1/titles/', '/api/v1/genres/',
+                    '/api/v1/categories/'):
+            response = client.get(url)
+            etag = response.get('ETag')
+            assert etag, (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовок `ETag`.'
+            )
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с совпадающим '
+                '`If-None-Match` возвращает ответ со статусом 304.'
+            )
+
+    def test_02_write_invalidates_cache(self, admin_client, client):
+        url = '/api/v1/genres/'
+        genres = create_genre(admin_client)
+        response = client.get(url)
+        etag = response['ETag']
+        assert response.json()['count'] == len(genres)
+        admin_client.delete(f'{url}{genres[0]["slug"]}/')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что удаление жанра сбрасывает кэш ответа `{url}`.'
+        )
+        assert response.json()['count'] == len(genres) - 1
+
+    def test_03_review_invalidates_title_cache(self, admin_client,
+                                               user_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+        user_client.post(f'{url}reviews/', data={'text': 'ok', 'score': 7})
+        assert client.get(url).json()['rating'] == 7, (
+            f'Проверьте, что новый отзыв сбрасывает кэш ответа `{url}`.'
+        )
+
+    def test_04_host_in_cache_key(self, client):
+        for number in range(12):
+            Genre.objects.create(name=f'Жанр {number}', slug=f'genre-{number}')
+        url = '/api/v1/genres/'
+        poisoned = client.get(url, HTTP_HOST='evil.example').json()
+        assert poisoned['next'].startswith('http://evil.example/')
+        assert client.get(url).json()['next'].startswith(
+            'http://testserver/'
+        ), (
+            'Проверьте, что хост запроса входит в ключ кэша ответов: '
+            'абсолютные ссылки пагинации не должны достаться другому хосту.'
+        )
+
+    def test_05_invalidate_after_commit(self, client):
+        url = '/api/v1/genres/'
+        assert client.get(url).json()['count'] == 0
+        with transaction.atomic():
+            Genre.objects.create(name='Драма', slug='drama')
+            version = get_catalog_version()
+        assert get_catalog_version() != version, (
+            'Проверьте, что кэш ответов сбрасывается после коммита '
+            'транзакции, а не внутри неё.'
+        )
+        assert client.get(url).json()['count'] == 1
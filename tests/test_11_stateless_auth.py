@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.authentication import get_cached_auth_state
+from api.views import get_tokens_for_user
+from titles.models import Title
+
+
+def get_client(user):
+    client = APIClient()
+    token = get_tokens_for_user(user)['access']
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11StatelessAuth:
+    url = '/api/v1/genres/'
+
+    def test_01_no_user_query(self, admin):
+        client = get_client(admin)
+        client.post(self.url, data={'name': 'Ужасы', 'slug': 'horror'})
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.url,
+                                   data={'name': 'Драма', 'slug': 'drama'})
+        assert response.status_code == HTTPStatus.CREATED
+        user_queries = [
+            query['sql'] for query in context.captured_queries
+            if 'users_user' in query['sql']
+        ]
+        assert not user_queries, (
+            'Проверьте, что для токена с ролью пользователь не загружается '
+            'из базы данных при каждом запросе.'
+        )
+
+    def test_02_role_change_takes_effect(self, admin):
+        client = get_client(admin)
+        admin.role = 'user'
+        admin.save()
+        response = client.post(self.url, data={'name': 'Ужасы',
+                                               'slug': 'horror'})
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что после смены роли права из старого токена '
+            'больше не действуют.'
+        )
+
+    def test_03_deleted_user_rejected(self, user):
+        client = get_client(user)
+        user.delete()
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_04_author_writes(self, user):
+        title = Title.objects.create(name='Title', year=2000)
+        client = get_client(user)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response = client.post(url, data={'text': 'ok', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username
+        response = client.patch(f'{url}{response.json()["id"]}/',
+                                data={'score': 6})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что автор с токеном без загрузки из базы может '
+            'редактировать свой отзыв.'
+        )
+
+    def test_05_rolled_back_role_change(self, admin):
+        client = get_client(admin)
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                admin.role = 'user'
+                admin.save()
+                assert get_cached_auth_state(admin.pk) == 'admin:0'
+                raise RuntimeError
+        assert get_cached_auth_state(admin.pk) == 'admin:0', (
+            'Проверьте, что права пользователя попадают в кэш только '
+            'после коммита транзакции.'
+        )
+        response = client.post(self.url, data={'name': 'Ужасы',
+                                               'slug': 'horror'})
+        assert response.status_code == HTTPStatus.CREATED
@@ -0,0 +1,30 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Metrics:
+    url = '/api/v1/_metrics'
+
+    def test_01_metrics_permissions(self, client, user_client):
+        assert client.get(self.url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(self.url).status_code == HTTPStatus.FORBIDDEN
+
+    def test_02_metrics_by_route(self, admin_client, client):
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/genres/')
+        response = admin_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос администратора к `{self.url}` '
+            'возвращает ответ со статусом 200.'
+        )
+        assert response['Content-Type'].startswith('text/plain')
+        content = response.content.decode()
+        for metric in ('yamdb_request_duration_seconds_count',
+                       'yamdb_request_db_queries_bucket',
+                       'yamdb_request_db_duration_seconds_sum'):
+            assert f'{metric}{{route="api:titles-list"' in content, (
+                f'Проверьте, что `{self.url}` содержит метрику `{metric}` '
+                'для маршрута `api:titles-list`.'
+            )
@@ -0,0 +1,29 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from titles.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13Benchmark:
+
+    def test_01_seed_and_benchmark(self, tmp_path):
+        call_command('seed_benchmark', titles=20, reviews=60, comments=100,
+                     genres=5, categories=2, stdout=StringIO())
+        assert Title.objects.count() == 20
+        assert Title.objects.filter(review_count=3).count() == 20, (
+            'Проверьте, что генератор данных обновляет рейтинг произведений.'
+        )
+        output = tmp_path / 'report.json'
+        call_command('benchmark', requests=3, warmup=1, output=str(output),
+                     stdout=StringIO())
+        report = json.loads(output.read_text())
+        assert report['dataset']['titles.Title'] == 20
+        for result in report['endpoints'].values():
+            assert result['errors'] == 0
+            for key in ('p50_ms', 'p95_ms', 'queries', 'rps'):
+                assert key in result
+        assert not report['failures']
@@ -0,0 +1,47 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from titles.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleSearch:
+    url = '/api/v1/titles/'
+
+    def search(self, client, query):
+        response = client.get(self.url, {'q': query})
+        assert response.status_code == 200
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_by_name_and_description(self, client):
+        Title.objects.create(name='Крёстный отец', year=1972,
+                             description='Семейная сага о мафии')
+        Title.objects.create(name='Мафия', year=2000,
+                             description='Игра')
+        Title.objects.create(name='Побег из Шоушенка', year=1994,
+                             description='Тюремная драма')
+        assert self.search(client, 'мафи') == ['Мафия', 'Крёстный отец'], (
+            f'Проверьте, что `{self.url}?q=` ищет по префиксу в названии и '
+            'описании и ставит совпадения в названии выше.'
+        )
+        assert self.search(client, 'побег тюрем') == ['Побег из Шоушенка']
+        assert self.search(client, 'терминатор') == []
+
+    def test_02_index_follows_writes(self, client):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        assert self.search(client, 'термин') == ['Терминатор']
+        title.name = 'Чужой'
+        title.save()
+        assert self.search(client, 'термин') == []
+        assert self.search(client, 'чуж') == ['Чужой']
+        title.delete()
+        assert self.search(client, 'чуж') == []
+
+    def test_03_rebuild_command(self, client):
+        Title.objects.bulk_create([
+            Title(name=f'Фильм {idx}', year=2000) for idx in range(3)
+        ])
+        call_command('rebuild_title_search', stdout=StringIO())
+        assert len(self.search(client, 'фильм')) == 3
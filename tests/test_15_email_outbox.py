@@ -0,0 +1,128 @@
+import socket
+import socketserver
+import threading
+from email import message_from_bytes
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+from users.models import OutgoingEmail
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер: принимает любые письма и запоминает
+    их вместе с номером соединения
+    """
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections.append(self)
+        number = len(self.server.connections)
+        self.reply('220 localhost')
+        for line in self.rfile:
+            command = line[:4].upper()
+            if command == b'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = b''.join(iter(self.rfile.readline, b'.\r\n'))
+                self.server.messages.append(
+                    (number, message_from_bytes(data))
+                )
+            elif command == b'QUIT':
+                self.reply('221 Bye')
+                return
+            self.reply('250 OK')
+
+
+@pytest.fixture
+def smtp_server(settings):
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), SMTPHandler)
+    server.daemon_threads = True
+    server.connections = []
+    server.messages = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    settings.EMAIL_HOST, settings.EMAIL_PORT = server.server_address
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get_free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+
+    def signup(self, client, idx):
+        data = {'email': f'user{idx}@yamdb.fake', 'username': f'user{idx}'}
+        response = client.post(self.url_signup, data=data)
+        assert response.status_code == 200
+        return data
+
+    def test_01_signup_only_queues_email(self, client):
+        outbox_before_count = len(mail.outbox)
+        self.signup(client, 1)
+        assert len(mail.outbox) == outbox_before_count, (
+            f'Проверьте, что POST-запрос к `{self.url_signup}` не отправляет '
+            'письмо сам, а ставит его в очередь.'
+        )
+        assert OutgoingEmail.objects.filter(
+            recipient='user1@yamdb.fake', status=OutgoingEmail.PENDING
+        ).exists()
+
+    def test_02_worker_drains_queue(self, client, smtp_server):
+        for idx in range(7):
+            self.signup(client, idx)
+        call_command('send_emails', once=True, threads=3, batch_size=2,
+                     stdout=StringIO())
+        assert sorted(
+            message['To'] for _, message in smtp_server.messages
+        ) == sorted(f'user{idx}@yamdb.fake' for idx in range(7)), (
+            'Проверьте, что воркер отправляет каждое письмо ровно один раз.'
+        )
+        assert not OutgoingEmail.objects.exclude(
+            status=OutgoingEmail.SENT
+        ).exists()
+        assert not OutgoingEmail.objects.exclude(message='').exists(), (
+            'Проверьте, что текст с кодом подтверждения стирается после '
+            'отправки письма.'
+        )
+
+    def test_03_connection_per_batch(self, client, smtp_server):
+        for idx in range(7):
+            self.signup(client, idx)
+        call_command('send_emails', once=True, threads=1, batch_size=3,
+                     stdout=StringIO())
+        assert len(smtp_server.messages) == 7
+        assert len(smtp_server.connections) == 3, (
+            'Проверьте, что воркер открывает одно SMTP-соединение '
+            'на пачку писем.'
+        )
+        assert [number for number, _ in smtp_server.messages] == [
+            1, 1, 1, 2, 2, 2, 3
+        ]
+
+    def test_04_failed_email_is_retried(self, client, settings):
+        self.signup(client, 1)
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+        settings.EMAIL_HOST = '127.0.0.1'
+        settings.EMAIL_PORT = get_free_port()
+        call_command('send_emails', once=True, threads=1, max_attempts=2,
+                     backoff=0, stdout=StringIO(), stderr=StringIO())
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.FAILED, (
+            'Проверьте, что письмо, которое не удалось отправить за '
+            'max_attempts попыток, помечается как неотправленное.'
+        )
+        assert email.attempts == 2
+        assert 'ConnectionRefusedError' in email.last_error
+        assert email.message == ''
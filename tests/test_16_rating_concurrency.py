@@ -0,0 +1,80 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import OperationalError, connection
+from django.db.models import Count, Sum
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import Review
+from titles.models import Title
+
+THREADS = 8
+USERS = 24
+
+
+def with_retry(request, *args, **kwargs):
+    """SQLite в тестах не ждёт освобождения блокировки, повторяем сами"""
+    for _ in range(200):
+        try:
+            return request(*args, **kwargs)
+        except OperationalError:
+            time.sleep(random.random() / 100)
+    raise AssertionError('База данных так и не освободилась')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16RatingConcurrency:
+
+    def hammer(self, title_id, user):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        try:
+            # Повтор запроса, упавшего уже после коммита, получит 400
+            # из-за существующего отзыва, поэтому id берём из базы
+            with_retry(client.post, url, data={'text': 'text', 'score': 5})
+            review = with_retry(Review.objects.get, title_id=title_id,
+                                author=user)
+            review_url = f'{url}{review.id}/'
+            for score in (1, 10, random.randint(1, 10)):
+                response = with_retry(client.patch, review_url,
+                                      data={'score': score})
+                assert response.status_code == 200
+            if user.id % 3 == 0:
+                response = with_retry(client.delete, review_url)
+                assert response.status_code in (204, 404)
+        finally:
+            connection.close()
+
+    def test_01_concurrent_reviews_keep_rating_consistent(
+            self, django_user_model
+    ):
+        title = Title.objects.create(name='Hot title', year=2000)
+        users = [
+            django_user_model.objects.create_user(
+                username=f'user{idx}', email=f'user{idx}@yamdb.fake'
+            )
+            for idx in range(USERS)
+        ]
+        with ThreadPoolExecutor(THREADS) as executor:
+            for future in [executor.submit(self.hammer, title.id, user)
+                           for user in users]:
+                future.result()
+        title.refresh_from_db()
+        expected = Review.objects.filter(title=title).aggregate(
+            score_sum=Sum('score'), review_count=Count('id')
+        )
+        assert expected['review_count'] == USERS - USERS // 3
+        assert title.score_sum == expected['score_sum'], (
+            'Проверьте, что сумма оценок произведения совпадает с полным '
+            'пересчётом после конкурентных изменений отзывов.'
+        )
+        assert title.review_count == expected['review_count']
+        assert title.rating == pytest.approx(
+            expected['score_sum'] / expected['review_count']
+        )
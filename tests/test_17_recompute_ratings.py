@@ -0,0 +1,118 @@
+import os
+import sqlite3
+import subprocess
+import sys
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from api.management.commands import recompute_ratings
+from reviews.models import Review
+from reviews.ratings import get_rating_aggregates
+from titles.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17RecomputeRatings:
+
+    def test_01_drift_is_reported_and_fixed(self):
+        call_command('seed_benchmark', titles=30, reviews=90, comments=0,
+                     genres=3, categories=2, stdout=StringIO())
+        expected = {
+            title.pk: (title.score_sum, title.review_count, title.rating)
+            for title in Title.objects.all()
+        }
+        drifted = list(Title.objects.values_list('pk', flat=True)[:5])
+        Title.objects.filter(pk__in=drifted).update(
+            score_sum=0, review_count=1, rating=0.0
+        )
+
+        out = StringIO()
+        call_command('recompute_ratings', chunk_size=7, dry_run=True,
+                     stdout=out)
+        assert 'drift found in 5' in out.getvalue()
+        assert Title.objects.filter(review_count=1).count() == 5, (
+            'Проверьте, что с --dry-run рейтинги не изменяются.'
+        )
+
+        out = StringIO()
+        call_command('recompute_ratings', chunk_size=7, stdout=out)
+        assert 'drift found in 5, fixed' in out.getvalue()
+        assert {
+            title.pk: (title.score_sum, title.review_count, title.rating)
+            for title in Title.objects.all()
+        } == expected, (
+            'Проверьте, что recompute_ratings восстанавливает рейтинг '
+            'по отзывам.'
+        )
+
+        out = StringIO()
+        call_command('recompute_ratings', stdout=out)
+        assert 'drift found in 0' in out.getvalue()
+
+    def test_02_review_saved_during_recompute(self, monkeypatch, user):
+        title = Title.objects.create(name='Фильм', year=2000)
+        Title.objects.filter(pk=title.pk).update(score_sum=1, review_count=1,
+                                                 rating=1.0)
+
+        def aggregates_then_review(reviews):
+            aggregates = get_rating_aggregates(reviews)
+            Review.objects.create(title=title, author=user, text='Позже',
+                                  score=8)
+            return aggregates
+
+        monkeypatch.setattr(recompute_ratings, 'get_rating_aggregates',
+                            aggregates_then_review)
+        assert recompute_ratings.recompute_chunk(
+            title.pk, title.pk + 1, True
+        ) == (1, [title.pk])
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count, title.rating) == (
+            8, 1, 8.0
+        ), (
+            'Проверьте, что recompute_ratings не перезаписывает рейтинг '
+            'устаревшими суммами, если отзыв сохранён во время сверки.'
+        )
+
+    def test_03_workers(self, tmp_path):
+        """Дочерние процессы не видят базу тестов в памяти, поэтому
+        команда запускается отдельно на временной базе в файле
+        """
+        database = tmp_path / 'db.sqlite3'
+        env = {**os.environ, 'DB_NAME': str(database)}
+
+        def manage(*args):
+            return subprocess.run(
+                (sys.executable, 'manage.py', *args, '--skip-checks'),
+                cwd=settings.BASE_DIR, env=env, check=True,
+                capture_output=True, text=True
+            ).stdout
+
+        manage('migrate')
+        manage('seed_benchmark', '--titles=30', '--reviews=90',
+               '--comments=0', '--genres=3', '--categories=2')
+        with sqlite3.connect(database) as db:
+            expected = db.execute(
+                'SELECT id, score_sum, review_count, rating '
+                'FROM titles_title ORDER BY id'
+            ).fetchall()
+            db.execute('UPDATE titles_title SET score_sum = 0, '
+                       'review_count = 1, rating = 0 WHERE id <= 5')
+        db.close()
+
+        out = manage('recompute_ratings', '--workers=2', '--chunk-size=7')
+        assert 'drift found in 5, fixed' in out, (
+            'Проверьте, что recompute_ratings с --workers находит '
+            'расхождения во всех пачках.'
+        )
+        with sqlite3.connect(database) as db:
+            assert db.execute(
+                'SELECT id, score_sum, review_count, rating '
+                'FROM titles_title ORDER BY id'
+            ).fetchall() == expected, (
+                'Проверьте, что recompute_ratings с --workers исправляет '
+                'рейтинги.'
+            )
+        db.close()
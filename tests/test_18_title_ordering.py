@@ -0,0 +1,94 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.filters import TitleFilterSet
+from titles.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18TitleOrdering:
+    url = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        rows = (
+            ('Б', 1990, 3, 9),
+            ('А', 2000, 1, 5),
+            ('В', 1980, 2, 14),
+            ('Г', 2010, 0, 0),
+        )
+        for name, year, review_count, score_sum in rows:
+            Title.objects.create(
+                name=name, year=year, review_count=review_count,
+                score_sum=score_sum,
+                rating=score_sum / review_count if review_count else None
+            )
+
+    def names(self, client, **params):
+        response = client.get(self.url, params)
+        assert response.status_code == 200, (
+            f'Проверьте, что `{self.url}` принимает параметры {params}.'
+        )
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_ordering(self, client, titles):
+        assert self.names(client, ordering='-rating') == ['В', 'А', 'Б', 'Г']
+        assert self.names(client, ordering='rating') == ['Г', 'Б', 'А', 'В']
+        assert self.names(client, ordering='year') == ['В', 'Б', 'А', 'Г']
+        assert self.names(client, ordering='-year') == ['Г', 'А', 'Б', 'В']
+        assert self.names(client, ordering='review_count') == [
+            'Г', 'А', 'В', 'Б'
+        ]
+        assert self.names(client, ordering='name') == ['А', 'Б', 'В', 'Г']
+
+    def test_02_range_filters(self, client, titles):
+        assert self.names(client, rating_min=3.5, ordering='rating') == [
+            'А', 'В'
+        ]
+        assert self.names(client, rating_max=4) == ['Б']
+        assert self.names(client, year_min=1985, year_max=2000) == ['Б', 'А']
+
+    def test_03_filter_set(self, client, titles):
+        assert set(TitleFilterSet.base_filters) == {
+            'genre', 'category', 'name', 'year', 'year_min', 'year_max',
+            'rating_min', 'rating_max', 'q'
+        }, 'Проверьте, что служебные поля произведения не служат фильтрами.'
+        for internal in ({'score_sum': 0}, {'review_count': 0},
+                         {'rating': 5}, {'is_deleted': True}):
+            assert len(self.names(client, **internal)) == 4, (
+                f'Проверьте, что параметр {internal} не фильтрует список.'
+            )
+        assert self.names(client, year_max=1990, ordering='year') == [
+            'В', 'Б'
+        ]
+        assert self.names(client, rating_min=3, rating_max=5,
+                          ordering='name') == ['А', 'Б']
+        assert self.names(client, q='А') == ['А']
+        assert self.names(client, q='А', year_min=2001) == [], (
+            'Проверьте, что поиск `q` сочетается с фильтрами по диапазону.'
+        )
+
+    @pytest.mark.parametrize('params', (
+        {'ordering': '-rating'},
+        {'ordering': 'year'},
+        {'ordering': 'review_count'},
+        {'ordering': 'name'},
+        {'ordering': 'rating', 'rating_min': 3},
+        {'ordering': '-year', 'year_min': 1985, 'year_max': 2000},
+    ))
+    def test_04_sorting_uses_index(self, client, titles, params):
+        with CaptureQueriesContext(connection) as context:
+            self.names(client, **params)
+        sql = next(
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "titles_title"' in query['sql']
+            and 'LIMIT' in query['sql']
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        assert 'TEMP B-TREE' not in plan and 'title_' in plan, (
+            f'Проверьте, что сортировка {params} идёт по индексу: {plan}'
+        )
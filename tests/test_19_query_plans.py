@@ -0,0 +1,82 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review
+from titles.models import Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19QueryPlans:
+    """Горячие запросы вложенных эндпоинтов не должны сканировать
+    таблицы целиком или сортировать во временном B-дереве
+    """
+
+    @pytest.fixture
+    def catalog(self, user):
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(name='Фильм', year=2000)
+        title.genre.add(genre)
+        review = Review.objects.create(title=title, author=user,
+                                       text='Отзыв', score=7)
+        Comment.objects.create(review=review, author=user, text='Комментарий')
+        return title, review
+
+    def get_plans(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        plans = {}
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT'):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plans[sql] = ' | '.join(row[-1] for row in cursor.fetchall())
+        return plans
+
+    def assert_indexed(self, plans, table, allow_sort=False):
+        checked = [plan for sql, plan in plans.items()
+                   if f'FROM "{table}"' in sql or f'JOIN "{table}"' in sql]
+        assert checked, f'Нет запросов к таблице {table}'
+        for plan in checked:
+            assert not re.search(r'\bSCAN\b', plan), (
+                f'Запрос к {table} сканирует таблицу целиком: {plan}'
+            )
+            if not allow_sort:
+                assert 'TEMP B-TREE' not in plan, (
+                    f'Запрос к {table} сортирует без индекса: {plan}'
+                )
+
+    @pytest.mark.parametrize('query', ('', '?pagination=cursor'))
+    def test_01_reviews(self, client, catalog, query):
+        title, _ = catalog
+        plans = self.get_plans(
+            client, f'/api/v1/titles/{title.id}/reviews/{query}'
+        )
+        self.assert_indexed(plans, 'reviews_review')
+
+    @pytest.mark.parametrize('query', ('', '?pagination=cursor'))
+    def test_02_comments(self, client, catalog, query):
+        title, review = catalog
+        plans = self.get_plans(
+            client,
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/{query}'
+        )
+        self.assert_indexed(plans, 'reviews_comment')
+
+    def test_03_title_genres(self, client, catalog):
+        # Жанры одной страницы сортируются в памяти, а сортировка по полю
+        # другой таблицы соединения неизбежна, но связующая таблица
+        # должна читаться по индексу
+        plans = self.get_plans(client, '/api/v1/titles/')
+        self.assert_indexed(plans, 'titles_title_genre', allow_sort=True)
+        plans = self.get_plans(client, '/api/v1/titles/?genre=drama')
+        self.assert_indexed(plans, 'titles_title_genre', allow_sort=True)
+        assert any(
+            'COVERING INDEX titles_title_genre_genre_title_idx' in plan
+            for plan in plans.values()
+        )
@@ -0,0 +1,115 @@
+import importlib
+from unittest import mock
+
+import pytest
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler
+from django.test import override_settings
+from rest_framework.exceptions import ValidationError
+
+from api_yamdb import settings as base_settings
+from api.views import TitleViewSet
+from titles.models import Category, Title
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 1234,
+    'cache_size': -2048,
+}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20SqliteProfile:
+
+    def test_01_pragmas_applied_on_connect(self, tmp_path):
+        handler = ConnectionHandler({'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': str(tmp_path / 'db.sqlite3'),
+        }})
+        connection = handler['default']
+        try:
+            with override_settings(SQLITE_PRAGMAS=PRAGMAS):
+                connection.ensure_connection()
+            with connection.cursor() as cursor:
+                values = {}
+                for name in PRAGMAS:
+                    cursor.execute(f'PRAGMA {name}')
+                    values[name] = cursor.fetchone()[0]
+        finally:
+            connection.close()
+        assert values == {
+            'journal_mode': 'wal',
+            'synchronous': 1,
+            'busy_timeout': 1234,
+            'cache_size': -2048,
+        }, 'Проверьте, что прагмы SQLITE_PRAGMAS применяются к соединению.'
+
+    @override_settings(DB_LOCK_BACKOFF=0)
+    def test_02_write_retried_when_locked(self, admin_client):
+        Category.objects.create(name='Фильм', slug='movie')
+        perform_create = TitleViewSet.perform_create
+        calls = []
+
+        def locked_once(view, serializer):
+            calls.append(1)
+            perform_create(view, serializer)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+
+        with mock.patch.object(TitleViewSet, 'perform_create', locked_once):
+            response = admin_client.post('/api/v1/titles/', data={
+                'name': 'Чужой', 'year': 1979, 'category': 'movie',
+            })
+        assert response.status_code == 201, (
+            'Проверьте, что запись повторяется после «database is locked».'
+        )
+        assert len(calls) == 2
+        assert Title.objects.filter(name='Чужой').count() == 1, (
+            'Проверьте, что неудачная попытка откатывается целиком.'
+        )
+
+    @override_settings(DB_LOCK_BACKOFF=0, DB_LOCK_RETRIES=2)
+    def test_03_other_errors_not_retried(self, admin_client):
+        Category.objects.create(name='Фильм', slug='movie')
+        calls = []
+
+        def failing(view, serializer):
+            calls.append(1)
+            raise OperationalError('disk I/O error')
+
+        with mock.patch.object(TitleViewSet, 'perform_create', failing):
+            with pytest.raises(OperationalError):
+                admin_client.post('/api/v1/titles/', data={
+                    'name': 'Чужой', 'year': 1979, 'category': 'movie',
+                })
+        assert len(calls) == 1
+
+    def test_04_error_response_rolled_back(self, admin_client):
+        Category.objects.create(name='Фильм', slug='movie')
+        perform_create = TitleViewSet.perform_create
+
+        def save_then_reject(view, serializer):
+            perform_create(view, serializer)
+            raise ValidationError({'name': ['Отклонено после записи']})
+
+        with mock.patch.object(TitleViewSet, 'perform_create',
+                               save_then_reject):
+            response = admin_client.post('/api/v1/titles/', data={
+                'name': 'Чужой', 'year': 1979, 'category': 'movie',
+            })
+        assert response.status_code == 400
+        assert not Title.objects.exists(), (
+            'Проверьте, что запись откатывается, если запрос завершился '
+            'ошибкой API.'
+        )
+
+    def test_05_prod_settings_copy_databases(self):
+        prod = importlib.import_module('api_yamdb.settings_prod')
+        assert prod.DATABASES['default']['CONN_MAX_AGE'] == 600
+        assert base_settings.DATABASES['default'].get(
+            'CONN_MAX_AGE'
+        ) != 600, (
+            'Проверьте, что settings_prod не изменяет DATABASES базовых '
+            'настроек.'
+        )
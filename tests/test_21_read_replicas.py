@@ -0,0 +1,63 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
+
+from titles.models import Category, Title
+
+REPLICA = 'replica_0'
+
+
+@pytest.fixture
+def replica(transactional_db, tmp_path):
+    """Вторая база SQLite в файле, которую синхронизирует sync_replicas"""
+    connections.settings[REPLICA] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': str(tmp_path / 'replica.sqlite3'),
+    }
+    with override_settings(READ_REPLICAS=[REPLICA]):
+        call_command('sync_replicas', once=True, stdout=StringIO())
+        yield
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.settings[REPLICA]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ReadReplicas:
+    url = '/api/v1/titles/'
+
+    def names(self, client, **params):
+        response = client.get(self.url, params)
+        assert response.status_code == 200
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_reads_go_to_replica(self, client, replica):
+        Title.objects.create(name='Чужой', year=1979)
+        assert self.names(client) == [], (
+            'Проверьте, что GET-запросы к каталогу читают из реплики.'
+        )
+        call_command('sync_replicas', once=True, stdout=StringIO())
+        assert self.names(client) == ['Чужой'], (
+            'Проверьте, что sync_replicas копирует данные в реплику и '
+            'сбрасывает кэш ответов.'
+        )
+
+    def test_02_writer_reads_own_writes(self, client, admin_client,
+                                        replica):
+        Category.objects.create(name='Фильм', slug='movie')
+        response = admin_client.post(self.url, data={
+            'name': 'Чужой', 'year': 1979, 'category': 'movie',
+        })
+        assert response.status_code == 201
+        assert self.names(client) == [], (
+            'Проверьте, что остальные пользователи читают из реплики.'
+        )
+        assert self.names(admin_client) == ['Чужой'], (
+            'Проверьте, что после записи пользователь читает из основной '
+            'базы и видит свои изменения, даже если ответ по тому же '
+            'адресу уже закэширован из реплики.'
+        )
+        assert self.names(client) == []
@@ -0,0 +1,104 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from titles.catalog import catalog_cache
+from titles.models import CatalogVersion, Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22CatalogCache:
+    url = '/api/v1/titles/'
+
+    @pytest.fixture
+    def catalog(self):
+        Category.objects.create(name='Фильм', slug='movie')
+        for slug in ('drama', 'comedy', 'horror'):
+            Genre.objects.create(name=slug, slug=slug)
+
+    def post_title(self, client, name, genres):
+        return client.post(self.url, data={
+            'name': name, 'year': 2000, 'category': 'movie', 'genre': genres,
+        })
+
+    def test_01_slugs_resolved_without_queries(self, admin_client, catalog):
+        assert self.post_title(
+            admin_client, 'Первый', ['drama']
+        ).status_code == 201
+        with CaptureQueriesContext(connection) as context:
+            response = self.post_title(
+                admin_client, 'Второй', ['drama', 'comedy', 'horror']
+            )
+        assert response.status_code == 201
+        lookups = [query['sql'] for query in context.captured_queries
+                   if '"slug" = ' in query['sql']
+                   or '"slug" IN' in query['sql']]
+        assert not lookups, (
+            'Проверьте, что жанры и категории при создании произведения '
+            'берутся из кэша каталога, без запроса на каждый slug.'
+        )
+        assert set(Title.objects.get(name='Второй').genre.values_list(
+            'slug', flat=True
+        )) == {'drama', 'comedy', 'horror'}
+
+    def test_02_unknown_slug_rejected(self, admin_client, catalog):
+        response = self.post_title(admin_client, 'Фильм', ['western'])
+        assert response.status_code == 400
+        assert 'genre' in response.json()
+
+    @override_settings(CATALOG_CACHE_CHECK_INTERVAL=3600)
+    def test_03_other_worker_changes_are_seen(self, admin_client, catalog):
+        assert catalog_cache.get_by_slug(Genre, 'drama').name == 'drama'
+        # Другой воркер: изменения в базе без сигналов этого процесса
+        Genre.objects.bulk_create([Genre(name='Вестерн', slug='western')])
+        Genre.objects.filter(slug='drama').update(name='Драма')
+        CatalogVersion.bump()
+        assert self.post_title(
+            admin_client, 'Фильм', ['western']
+        ).status_code == 201, (
+            'Проверьте, что кэш каталога перечитывается, если slug не '
+            'найден, а версия в базе изменилась.'
+        )
+        assert catalog_cache.get_by_slug(Genre, 'drama').name == 'Драма'
+
+    def test_04_local_writes_invalidate(self, admin_client, catalog):
+        version = CatalogVersion.get_current()
+        response = admin_client.post('/api/v1/genres/', data={
+            'name': 'Вестерн', 'slug': 'western'
+        })
+        assert response.status_code == 201
+        assert CatalogVersion.get_current() == version + 1, (
+            'Проверьте, что создание жанра увеличивает версию каталога.'
+        )
+        assert catalog_cache.get_by_slug(Genre, 'western') is not None
+
+    def test_05_clear_between_load_and_lookup(self, catalog, monkeypatch):
+        load = catalog_cache.load
+        calls = []
+
+        def load_then_clear(force=False):
+            load(force)
+            calls.append(force)
+            if len(calls) == 1:
+                # Сигнал из другого потока сбрасывает кэш после загрузки
+                catalog_cache.clear()
+
+        monkeypatch.setattr(catalog_cache, 'load', load_then_clear)
+        assert catalog_cache.get_by_slug(Genre, 'drama').slug == 'drama', (
+            'Проверьте, что сброс кэша жанров во время поиска не приводит '
+            'к ошибке.'
+        )
+        catalog_cache.clear()
+        category = Category.objects.get()
+        assert catalog_cache.get_by_id(Category, category.pk) == category
+
+    @override_settings(CATALOG_CACHE_CHECK_INTERVAL=3600)
+    def test_06_missing_slug_reloads_same_version(self, catalog):
+        assert catalog_cache.get_by_slug(Genre, 'drama') is not None
+        # Массовая загрузка в другом процессе без изменения версии
+        Genre.objects.bulk_create([Genre(name='Вестерн', slug='western')])
+        assert catalog_cache.get_by_slug(Genre, 'western') is not None, (
+            'Проверьте, что кэш каталога перечитывается, если slug не '
+            'найден, даже когда версия в базе не изменилась.'
+        )
@@ -0,0 +1,75 @@
+import json
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import AsyncClient
+
+from api.metrics import registry
+from reviews.models import Comment, Review
+from titles.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23AsyncReads:
+
+    @pytest.fixture
+    def catalog(self, user):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(name='Фильм', year=2000,
+                                     category=category)
+        title.genre.add(genre)
+        review = Review.objects.create(title=title, author=user,
+                                       text='Отзыв', score=7)
+        Comment.objects.create(review=review, author=user, text='Комментарий')
+        return title, review
+
+    def async_request(self, method, url, data=None):
+        async def request():
+            return await getattr(AsyncClient(), method)(url, data)
+        return async_to_sync(request)()
+
+    def async_get(self, url):
+        return self.async_request('get', url)
+
+    def test_01_same_responses_as_sync(self, client, catalog):
+        title, review = catalog
+        for path in (
+            'titles/',
+            f'titles/{title.id}/',
+            f'titles/{title.id}/reviews/',
+            f'titles/{title.id}/reviews/{review.id}/comments/',
+        ):
+            expected = client.get(f'/api/v1/{path}')
+            response = self.async_get(f'/api/v1/async/{path}')
+            assert response.status_code == expected.status_code == 200
+            assert response.json() == expected.json(), (
+                f'Проверьте, что `/api/v1/async/{path}` отдаёт то же, что '
+                'синхронный эндпоинт.'
+            )
+        assert self.async_get('/api/v1/async/titles/999/').status_code == 404
+
+    def test_02_reads_only(self, catalog):
+        response = self.async_request('post', '/api/v1/async/titles/',
+                                      {'name': 'Новый'})
+        assert response.status_code == 405
+
+    def test_03_metrics_count_queries(self, catalog):
+        title, _ = catalog
+        self.async_get(f'/api/v1/async/titles/{title.id}/reviews/')
+        histograms = registry.snapshot()['api:async-reviews-list']
+        assert histograms['queries']['total'] > 0, (
+            'Проверьте, что запросы к базе асинхронных эндпоинтов '
+            'попадают в метрики.'
+        )
+
+    def test_04_benchmark(self, catalog):
+        out = StringIO()
+        call_command('benchmark_async', clients=4, requests=2,
+                     client_delay=0, stdout=out)
+        report = json.loads(out.getvalue())
+        for handler in ('wsgi', 'asgi'):
+            assert report[handler]['requests'] == 8
+            assert report[handler]['errors'] == 0
@@ -0,0 +1,151 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.utils import timezone
+
+from api.db import is_locked
+from tasks.management.commands.run_worker import Command as WorkerCommand
+from tasks.models import Task
+from tasks.queue import enqueue, task
+
+calls = []
+
+
+@task
+def remember(value, suffix=''):
+    calls.append(f'{value}{suffix}')
+
+
+@task
+def explode():
+    raise ValueError('Сломалось')
+
+
+def run_worker(**options):
+    options = {'once': True, 'threads': 1, 'backoff': 0, **options}
+    call_command('run_worker', stdout=StringIO(), stderr=StringIO(),
+                 **options)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24TaskQueue:
+
+    @pytest.fixture(autouse=True)
+    def clear_calls(self):
+        calls.clear()
+
+    def test_01_task_runs(self):
+        queued = enqueue(remember, 'раз', suffix='!')
+        assert queued.status == Task.PENDING
+        run_worker()
+        queued.refresh_from_db()
+        assert calls == ['раз!']
+        assert queued.status == Task.DONE, (
+            'Проверьте, что выполненная задача получает статус done.'
+        )
+        assert queued.attempts == 1
+        assert queued.duration is not None and queued.finished_at
+
+    def test_02_retry_and_dead_letter(self):
+        queued = enqueue(explode, max_attempts=3)
+        run_worker()
+        queued.refresh_from_db()
+        assert queued.status == Task.DEAD, (
+            'Проверьте, что задача после исчерпания попыток получает '
+            'статус dead.'
+        )
+        assert queued.attempts == 3
+        assert 'ValueError: Сломалось' in queued.last_error
+
+    def test_03_backoff(self):
+        queued = enqueue(explode)
+        run_worker(backoff=60)
+        queued.refresh_from_db()
+        assert queued.status == Task.PENDING
+        assert queued.attempts == 1
+        assert queued.run_at > timezone.now() + timedelta(seconds=50), (
+            'Проверьте, что повтор задачи откладывается.'
+        )
+
+    def test_04_unknown_task(self):
+        with pytest.raises(KeyError):
+            enqueue('no.such.task')
+        queued = Task.objects.create(name='no.such.task')
+        run_worker()
+        queued.refresh_from_db()
+        assert queued.status == Task.DEAD
+        assert queued.attempts == 1
+
+    def test_05_claims_do_not_overlap(self):
+        for number in range(5):
+            enqueue(remember, number)
+        enqueue(remember, 'позже', run_at=timezone.now() + timedelta(hours=1))
+        worker = WorkerCommand()
+        worker.options = {'batch_size': 3, 'claim_timeout': 600}
+        first = worker.claim('first')
+        second = worker.claim('second')
+        assert len(first) == 3 and len(second) == 2
+        assert not {t.pk for t in first} & {t.pk for t in second}, (
+            'Проверьте, что одну задачу не забирают два воркера.'
+        )
+        assert worker.claim('third') == []
+
+        Task.objects.filter(claimed_by='first').update(
+            claimed_at=timezone.now() - timedelta(hours=1)
+        )
+        assert len(worker.claim('third')) == 3, (
+            'Проверьте, что задачи упавшего воркера забираются повторно.'
+        )
+
+    def test_06_threads_run_every_task_once(self):
+        for number in range(20):
+            enqueue(remember, number)
+        run_worker(threads=3, batch_size=2)
+        assert sorted(calls, key=int) == [str(n) for n in range(20)], (
+            'Проверьте, что каждая задача выполняется ровно один раз.'
+        )
+        assert Task.objects.filter(status=Task.DONE).count() == 20
+
+    def test_07_two_workers_race_for_one_task(self):
+        worker = WorkerCommand()
+        worker.options = {'batch_size': 1, 'claim_timeout': 600}
+
+        def claim(name, barrier, results):
+            try:
+                barrier.wait()
+                while True:
+                    try:
+                        results[name] = worker.claim(name)
+                        return
+                    except OperationalError as error:
+                        if not is_locked(error):
+                            raise
+            except Exception as error:
+                results[name] = error
+            finally:
+                connection.close()
+
+        for number in range(20):
+            queued = enqueue(remember, number)
+            barrier = threading.Barrier(2)
+            results = {}
+            threads = [
+                threading.Thread(target=claim, args=(name, barrier, results))
+                for name in ('first', 'second')
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            claimed = [batch for batch in results.values() if batch]
+            assert len(results) == 2 and len(claimed) == 1, (
+                'Проверьте, что задачу, за которую одновременно борются два '
+                f'воркера, забирает только один: {results}'
+            )
+            queued.refresh_from_db()
+            assert queued.attempts == 1
+            assert queued.claimed_by == claimed[0][0].claimed_by
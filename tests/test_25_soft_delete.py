@@ -0,0 +1,112 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+from reviews.models import Comment, Review
+from titles.models import Title
+from users.models import User
+
+
+def run_worker():
+    call_command('run_worker', once=True, threads=1, stdout=StringIO())
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25SoftDelete:
+
+    @pytest.fixture(autouse=True)
+    def small_chunks(self):
+        with override_settings(PURGE_CHUNK_SIZE=2):
+            yield
+
+    @pytest.fixture
+    def title(self, user, moderator, admin):
+        title = Title.objects.create(name='Фильм', year=2000)
+        for author, score in ((user, 4), (moderator, 8), (admin, 9)):
+            review = Review.objects.create(title=title, author=author,
+                                           text='Отзыв', score=score)
+            for number in range(3):
+                Comment.objects.create(review=review, author=user,
+                                       text=f'Комментарий {number}')
+        return title
+
+    def test_01_title(self, client, admin_client, title):
+        url = f'/api/v1/titles/{title.id}/'
+        assert admin_client.delete(url).status_code == 204
+        assert client.get(url).status_code == 404, (
+            'Проверьте, что удалённое произведение сразу скрывается.'
+        )
+        assert client.get(f'{url}reviews/').status_code == 404
+        assert client.get('/api/v1/titles/').json()['count'] == 0
+        assert Title.all_objects.filter(pk=title.pk).exists()
+        run_worker()
+        assert not Title.all_objects.exists(), (
+            'Проверьте, что фоновая задача удаляет произведение.'
+        )
+        assert not Review.all_objects.exists()
+        assert not Comment.objects.exists()
+
+    def test_02_review(self, client, user_client, title):
+        review = Review.objects.get(author__username='TestUser')
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        assert user_client.delete(f'{url}{review.id}/').status_code == 204
+        assert client.get(f'{url}{review.id}/').status_code == 404
+        assert client.get(f'{url}{review.id}/comments/').status_code == 404
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum) == (2, 17), (
+            'Проверьте, что оценка удалённого отзыва сразу исключается '
+            'из рейтинга.'
+        )
+        response = user_client.post(url, data={'text': 'Снова', 'score': 10})
+        assert response.status_code == 201, (
+            'Проверьте, что автор может оставить новый отзыв, не дожидаясь '
+            'удаления старого.'
+        )
+        assert set(response.json()) == {
+            'id', 'title', 'author', 'text', 'score', 'pub_date'
+        }, 'Проверьте, что служебное поле is_deleted не попадает в ответ.'
+        assert 'is_deleted' not in client.get(url).json()['results'][0]
+        run_worker()
+        assert not Review.all_objects.filter(pk=review.pk).exists()
+        assert Comment.objects.filter(review_id=review.pk).count() == 0
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum) == (3, 27)
+        out = StringIO()
+        call_command('recompute_ratings', dry_run=True, stdout=out)
+        assert 'drift found in 0' in out.getvalue()
+
+    def test_03_user(self, client, admin_client, user_client, title):
+        user = User.objects.get(username='TestUser')
+        assert admin_client.delete(
+            f'/api/v1/users/{user.username}/'
+        ).status_code == 204
+        assert user_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что удалённый пользователь сразу теряет доступ.'
+        )
+        reviews = client.get(f'/api/v1/titles/{title.id}/reviews/').json()
+        assert reviews['count'] == 2, (
+            'Проверьте, что отзывы удалённого пользователя сразу скрываются.'
+        )
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum) == (2, 17), (
+            'Проверьте, что оценки удалённого пользователя сразу '
+            'исключаются из рейтинга.'
+        )
+        out = StringIO()
+        call_command('recompute_ratings', dry_run=True, stdout=out)
+        assert 'drift found in 0' in out.getvalue()
+        review = Review.objects.exclude(author=user).first()
+        comments = client.get(
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        ).json()
+        assert comments['count'] == 0
+        run_worker()
+        assert not User.objects.filter(pk=user.pk).exists()
+        assert not Comment.objects.exists()
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum) == (2, 17), (
+            'Проверьте, что удаление отзывов пользователя не вычитает '
+            'их оценки из рейтинга повторно.'
+        )
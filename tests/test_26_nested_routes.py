@@ -0,0 +1,152 @@
+from unittest import mock
+
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.serializers import ReviewSerializer
+from api.views import get_tokens_for_user
+from reviews.models import Comment, Review
+from titles.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26NestedRoutes:
+
+    @pytest.fixture
+    def catalog(self, admin, moderator):
+        title = Title.objects.create(name='Фильм', year=2000)
+        other = Title.objects.create(name='Другой фильм', year=2001)
+        review = Review.objects.create(title=title, author=moderator,
+                                       text='Отзыв', score=7)
+        for number in range(3):
+            Comment.objects.create(review=review, author=admin,
+                                   text=f'Комментарий {number}')
+        return title, other, review
+
+    @pytest.fixture
+    def stateless_client(self, user):
+        """Роль в токене: аутентификация не обращается к базе"""
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Bearer {}'.format(
+            get_tokens_for_user(user)['access']
+        ))
+        return client
+
+    def request(self, client, method, url, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(client, method)(url, data=data)
+        return response, [query['sql'] for query in context.captured_queries]
+
+    @pytest.mark.parametrize('query', ('', '?pagination=cursor'))
+    def test_01_list_query_count(self, stateless_client, catalog, query):
+        title, _, review = catalog
+        urls = (
+            f'/api/v1/titles/{title.id}/reviews/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+        )
+        for url in urls:
+            response, queries = self.request(stateless_client, 'get',
+                                             url + query)
+            assert response.status_code == 200
+            assert len(queries) == (1 if query else 2), (
+                f'Проверьте, что GET-запрос к `{url}` проверяет родителей '
+                'в том же запросе, что выбирает страницу, и не загружает '
+                f'авторов по одному: {queries}'
+            )
+
+    def test_02_detail_query_count(self, stateless_client, catalog):
+        title, _, review = catalog
+        comment = review.comments.first()
+        urls = (
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+            f'{comment.id}/',
+        )
+        for url in urls:
+            response, queries = self.request(stateless_client, 'get', url)
+            assert response.status_code == 200
+            assert len(queries) == 1, (
+                f'Проверьте, что GET-запрос к `{url}` выполняет один запрос '
+                f'к базе данных: {queries}'
+            )
+
+    def test_03_wrong_parent(self, stateless_client, catalog):
+        title, other, review = catalog
+        empty, queries = self.request(
+            stateless_client, 'get', f'/api/v1/titles/{other.id}/reviews/'
+        )
+        assert empty.status_code == 200
+        assert empty.json()['results'] == []
+        assert len(queries) == 2, (
+            'Проверьте, что для пустого списка отзывов проверяется '
+            f'существование произведения: {queries}'
+        )
+        urls = (
+            f'/api/v1/titles/{other.id}/reviews/{review.id}/',
+            f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/',
+            f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/'
+            f'{review.comments.first().id}/',
+            f'/api/v1/titles/{title.id + other.id}/reviews/',
+        )
+        for url in urls:
+            assert stateless_client.get(url).status_code == 404, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает 404, если '
+                'отзыв не относится к произведению или его нет.'
+            )
+            response = stateless_client.get(url + '?pagination=cursor')
+            assert response.status_code == 404
+
+    def test_04_create_query_count(self, stateless_client, catalog):
+        title, other, review = catalog
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response, queries = self.request(stateless_client, 'post', url,
+                                         {'text': 'Мой отзыв', 'score': 9})
+        assert response.status_code == 201
+        assert response.json()['author'] == 'TestUser'
+        assert response.json()['title'] == title.name
+        selects = [sql for sql in queries if sql.startswith('SELECT')]
+        assert len(selects) == 2, (
+            'Проверьте, что при создании отзыва произведение и автор '
+            'загружаются по одному разу, без отдельной проверки '
+            f'дубликата: {queries}'
+        )
+        duplicate = stateless_client.post(url, {'text': 'Ещё', 'score': 1})
+        assert duplicate.status_code == 400, (
+            'Проверьте, что повторный отзыв на произведение запрещён.'
+        )
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum) == (2, 16)
+
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        response, queries = self.request(stateless_client, 'post', url,
+                                         {'text': 'Комментарий'})
+        assert response.status_code == 201
+        assert response.json()['author'] == 'TestUser'
+        assert response.json()['review'] == review.text
+        selects = [sql for sql in queries if sql.startswith('SELECT')]
+        assert len(selects) == 2, (
+            'Проверьте, что при создании комментария отзыв вместе с '
+            'произведением проверяется одним запросом, а автор '
+            f'загружается один раз: {queries}'
+        )
+        wrong = f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/'
+        assert stateless_client.post(
+            wrong, {'text': 'Комментарий'}
+        ).status_code == 404
+
+    def test_05_other_integrity_errors(self, stateless_client, catalog):
+        title, _, _ = catalog
+
+        def broken_save(serializer, **kwargs):
+            raise IntegrityError('NOT NULL constraint failed')
+
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        with mock.patch.object(ReviewSerializer, 'save', broken_save):
+            with pytest.raises(IntegrityError):
+                stateless_client.post(url, {'text': 'Отзыв', 'score': 9})
+        assert not Review.objects.filter(author__username='TestUser'), (
+            'Проверьте, что только нарушение уникальности отзыва '
+            'превращается в ошибку о повторном отзыве.'
+        )
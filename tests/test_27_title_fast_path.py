@@ -0,0 +1,80 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from rest_framework.renderers import JSONRenderer
+
+from api.fast_serializers import fast_title_list, title_rows
+from api.serializers import TitleListSerializer
+from api.views import TitleViewSet
+from titles.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TitleFastPath:
+
+    @pytest.fixture
+    def catalog(self):
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        movie = Category.objects.create(name='Фильм', slug='movie')
+        titles = (
+            Title.objects.create(name='Без жанров', year=1990),
+            Title.objects.create(name='Комедия «Ёж»', year=2001,
+                                 description='Описание', category=movie,
+                                 score_sum=17, review_count=3, rating=17 / 3),
+            Title.objects.create(name='Драмеди', year=2010, description='',
+                                 category=movie, score_sum=10,
+                                 review_count=1, rating=10),
+        )
+        titles[1].genre.set((comedy,))
+        titles[2].genre.set((comedy, drama))
+        # Вторая страница списка
+        Title.objects.bulk_create(
+            Title(name=f'Фильм {number}', year=2020) for number in range(4)
+        )
+        return titles
+
+    def render_drf(self, queryset):
+        return JSONRenderer().render(
+            TitleListSerializer(list(queryset), many=True).data
+        )
+
+    def test_01_output_is_identical(self, catalog):
+        queryset = TitleViewSet.queryset.order_by('-rating', 'id')
+        fast = JSONRenderer().render(
+            fast_title_list(list(title_rows(queryset)))
+        )
+        assert fast == self.render_drf(queryset), (
+            'Проверьте, что быстрый путь выводит тот же JSON, что и '
+            '`TitleListSerializer`.'
+        )
+
+    @pytest.mark.parametrize('query', (
+        '', '?genre=comedy', '?category=movie', '?ordering=-rating',
+        '?q=ёж', '?year_min=2000&ordering=name', '?page=2',
+    ))
+    def test_02_endpoint(self, client, catalog, query):
+        response = client.get(f'/api/v1/titles/{query}')
+        assert response.status_code == 200
+        results = response.json()['results']
+        queryset = TitleViewSet.queryset.filter(
+            pk__in=[title['id'] for title in results]
+        )
+        by_id = {title.pk: title for title in queryset}
+        expected = self.render_drf(by_id[title['id']] for title in results)
+        assert JSONRenderer().render(results) == expected, (
+            f'Проверьте, что GET-запрос к `/api/v1/titles/{query}` выводит '
+            'произведения в формате `TitleListSerializer`.'
+        )
+
+    def test_03_micro_benchmark(self, catalog, tmp_path):
+        output = tmp_path / 'report.json'
+        call_command('benchmark_serializers', rows=10, repeat=1,
+                     output=str(output), stdout=StringIO())
+        report = json.loads(output.read_text())
+        assert report['rows'] == 7
+        for path in ('drf', 'fast'):
+            assert set(report[path]) == {'cpu_us_per_row',
+                                         'peak_bytes_per_row'}
@@ -0,0 +1,129 @@
+import json
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.renderers import FastJSONRenderer
+from titles.models import Genre, Title
+
+SAMPLE = {
+    'text': 'Ёж «в тумане»     \\ " </script>',
+    'numbers': [1, -2, 0.1, 17 / 3, 9.5, 12345678901234, None, True],
+    'nested': OrderedDict((('b', 1), ('a', [{}, []]))),
+    'decimal': Decimal('1.50'),
+    'date': datetime(2022, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    'uuid': uuid.UUID(int=1),
+    1: 'ключ-число',
+}
+
+
+class Test28JSONRenderer:
+
+    def test_01_same_bytes_as_json_renderer(self):
+        assert FastJSONRenderer().render(SAMPLE) == JSONRenderer().render(
+            SAMPLE
+        ), (
+            'Проверьте, что `FastJSONRenderer` выводит те же байты, что и '
+            '`JSONRenderer`.'
+        )
+        context = {'indent': 4}
+        assert FastJSONRenderer().render(
+            SAMPLE, renderer_context=context
+        ) == JSONRenderer().render(SAMPLE, renderer_context=context)
+        assert FastJSONRenderer().render(None) == b''
+
+    def test_02_exponent_floats(self):
+        data = [1e-7, 1e16, 1.5e300]
+        assert json.loads(FastJSONRenderer().render(data)) == data
+
+    def test_03_stdlib_fallback(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+        assert FastJSONRenderer().render(SAMPLE) == JSONRenderer().render(
+            SAMPLE
+        ), 'Проверьте, что без orjson рендерер использует стандартный json.'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28StreamingList:
+
+    @pytest.fixture(autouse=True)
+    def small_chunks(self):
+        with override_settings(STREAM_CHUNK_SIZE=2):
+            yield
+
+    @pytest.fixture
+    def titles(self):
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        titles = [Title.objects.create(name=f'Фильм {number}', year=2000)
+                  for number in range(7)]
+        for title in titles[::2]:
+            title.genre.add(drama)
+        return titles
+
+    def get_all_pages(self, client, url):
+        results = []
+        while url:
+            data = client.get(url).json()
+            results.extend(data['results'])
+            url = data['next']
+        return results
+
+    def test_01_stream(self, admin_client, client, titles):
+        url = '/api/v1/titles/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(f'{url}?stream=true')
+            assert response.streaming, (
+                'Проверьте, что `?stream=true` отдаёт потоковый ответ.'
+            )
+            content = b''.join(response.streaming_content)
+        genre_queries = [query for query in context.captured_queries
+                         if 'titles_title_genre' in query['sql']]
+        assert len(genre_queries) == 4, (
+            'Проверьте, что жанры загружаются одним запросом на пачку.'
+        )
+        assert response['Content-Type'] == 'application/json'
+        assert json.loads(content) == self.get_all_pages(client, url), (
+            'Проверьте, что поток содержит все произведения без пагинации.'
+        )
+
+    def test_02_stream_filters(self, admin_client, titles):
+        response = admin_client.get('/api/v1/titles/?stream=1&genre=drama')
+        content = json.loads(b''.join(response.streaming_content))
+        assert [title['id'] for title in content] == [
+            title.id for title in titles[::2]
+        ]
+        response = admin_client.get('/api/v1/titles/?stream=1&genre=none')
+        assert b''.join(response.streaming_content) == b'[]'
+
+    def test_03_async_stream(self, client, token_admin, titles):
+        async def request():
+            return await AsyncClient().get(
+                '/api/v1/async/titles/?stream=true',
+                AUTHORIZATION=f'Bearer {token_admin["access"]}'
+            )
+        response = async_to_sync(request)()
+        assert response.status_code == 200
+        assert json.loads(response.content) == self.get_all_pages(
+            client, '/api/v1/titles/'
+        )
+
+    def test_04_stream_admin_only(self, client, user_client, titles):
+        url = '/api/v1/titles/?stream=true'
+        assert client.get(url).status_code == 401, (
+            'Проверьте, что `?stream=true` недоступен анонимному клиенту.'
+        )
+        assert user_client.get(url).status_code == 403, (
+            'Проверьте, что `?stream=true` доступен только админу.'
+        )
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert response.json()['count'] == len(titles)
@@ -0,0 +1,154 @@
+import csv
+import gzip
+import io
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+
+from api.export import export_catalog
+from reviews.models import Comment, Review
+from titles.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29CatalogExport:
+    url = '/api/v1/export/'
+
+    @pytest.fixture(autouse=True)
+    def small_chunks(self):
+        with override_settings(STREAM_CHUNK_SIZE=2):
+            yield
+
+    @pytest.fixture
+    def catalog(self, user, moderator):
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        movie = Category.objects.create(name='Фильм', slug='movie')
+        titles = [Title.objects.create(name=f'Фильм, {number}', year=2000,
+                                       category=movie)
+                  for number in range(5)]
+        titles[0].genre.set((drama, comedy))
+        review = Review.objects.create(title=titles[0], author=user,
+                                       text='Отзыв\nв две строки', score=7)
+        Comment.objects.create(review=review, author=moderator,
+                               text='Комментарий')
+        Title.objects.create(name='Удалено', year=2000).soft_delete()
+        return titles
+
+    def read(self, response):
+        assert response.status_code == 200
+        assert response.streaming
+        assert response['Content-Type'] == 'application/gzip'
+        return gzip.decompress(b''.join(response.streaming_content))
+
+    def test_01_permissions(self, client, user_client, catalog):
+        assert client.get(self.url).status_code == 401
+        assert user_client.get(self.url).status_code == 403, (
+            'Проверьте, что выгрузка каталога доступна только админу.'
+        )
+
+    def test_02_ndjson(self, admin_client, catalog):
+        content = self.read(admin_client.get(self.url))
+        records = [json.loads(line) for line in content.splitlines()]
+        assert [record['id'] for record in records] == [
+            title.id for title in catalog
+        ], 'Проверьте, что выгрузка содержит все видимые произведения.'
+        listed = admin_client.get(f'/api/v1/titles/{catalog[0].id}/').json()
+        assert records[0] == listed, (
+            'Проверьте, что записи выгрузки совпадают с ответом API.'
+        )
+        assert 'reviews' not in records[0]
+
+    def test_03_reviews(self, admin_client, catalog):
+        content = self.read(admin_client.get(f'{self.url}?reviews=true'))
+        records = [json.loads(line) for line in content.splitlines()]
+        assert len(records) == len(catalog)
+        (review,) = records[0]['reviews']
+        assert review['text'] == 'Отзыв\nв две строки'
+        assert review['author'] == 'TestUser'
+        assert [comment['author'] for comment in review['comments']] == [
+            'TestModerator'
+        ]
+        assert records[1]['reviews'] == []
+
+    def test_04_csv_and_resume(self, admin_client, catalog):
+        after_id = catalog[1].id
+        content = self.read(
+            admin_client.get(f'{self.url}?output=csv&after_id={after_id}')
+        )
+        rows = list(csv.DictReader(io.StringIO(content.decode())))
+        assert [int(row['id']) for row in rows] == [
+            title.id for title in catalog[2:]
+        ], 'Проверьте, что выгрузку можно продолжить с заданного id.'
+        assert rows[0]['name'] == 'Фильм, 2'
+        assert rows[0]['category'] == 'movie'
+        response = admin_client.get(f'{self.url}?output=csv&reviews=true')
+        assert response.status_code == 400
+        assert admin_client.get(f'{self.url}?output=xml').status_code == 400
+
+    def test_05_dump_catalog(self, catalog, tmp_path):
+        output = tmp_path / 'catalog.ndjson.gz'
+        stderr = StringIO()
+        call_command('dump_catalog', output=str(output), reviews=True,
+                     chunk_size=2, stderr=stderr)
+        with gzip.open(output, 'rt', encoding='utf-8') as dump:
+            records = [json.loads(line) for line in dump]
+        assert [record['id'] for record in records] == [
+            title.id for title in catalog
+        ]
+        assert f'last id {catalog[-1].id}' in stderr.getvalue()
+        output = tmp_path / 'catalog.csv.gz'
+        call_command('dump_catalog', output=str(output), export_format='csv',
+                     after_id=catalog[2].id, stderr=StringIO())
+        with gzip.open(output, 'rt', encoding='utf-8') as dump:
+            rows = list(csv.DictReader(dump))
+        assert [int(row['id']) for row in rows] == [
+            title.id for title in catalog[3:]
+        ]
+        with pytest.raises(CommandError):
+            call_command('dump_catalog', output=str(output),
+                         export_format='csv', reviews=True)
+
+    def test_06_reviews_streamed_in_order(self, catalog, user, moderator,
+                                          django_user_model):
+        authors = [django_user_model.objects.create_user(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        ) for number in range(3)]
+        # id отзывов и комментариев чередуются между произведениями
+        for author in authors:
+            for title in catalog[2:0:-1]:
+                review = Review.objects.create(title=title, author=author,
+                                               text='Текст', score=5)
+                for commenter in (user, moderator, authors[2]):
+                    Comment.objects.create(review=review, author=commenter,
+                                           text=f'К отзыву {review.id}')
+        Review.objects.filter(author=authors[0], title=catalog[1]).get(
+        ).soft_delete()
+        authors[2].is_active = False
+        authors[2].save()
+        content = b''.join(export_catalog(reviews=True, chunk_size=2))
+        records = {record['id']: record
+                   for record in map(json.loads, content.splitlines())}
+        assert len(records) == len(catalog)
+        for title in catalog[1:3]:
+            exported = records[title.id]['reviews']
+            assert [review['id'] for review in exported] == list(
+                Review.objects.filter(
+                    title=title, author__is_active=True
+                ).order_by('id').values_list('id', flat=True)
+            ), (
+                'Проверьте, что отзывы выгружаются по порядку id, без '
+                'удалённых и без отзывов неактивных авторов.'
+            )
+            assert len(exported) == (1 if title == catalog[1] else 2)
+            for review in exported:
+                assert [(comment['author'], comment['text'])
+                        for comment in review['comments']] == [
+                    ('TestUser', f'К отзыву {review["id"]}'),
+                    ('TestModerator', f'К отзыву {review["id"]}'),
+                ]
+        assert records[catalog[3].id]['reviews'] == []
@@ -0,0 +1,149 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from titles.models import CatalogVersion, Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30BulkCreate:
+
+    @pytest.fixture
+    def catalog(self, admin_client):
+        admin_client.post('/api/v1/genres/', data=[
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Комедия', 'slug': 'comedy'},
+        ], format='json')
+        admin_client.post('/api/v1/categories/', data=[
+            {'name': 'Фильм', 'slug': 'movie'},
+        ], format='json')
+
+    def post(self, client, url, data):
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(url, data=data, format='json')
+        return response, len(context.captured_queries)
+
+    @pytest.mark.parametrize('url,model', (
+        ('/api/v1/genres/', Genre), ('/api/v1/categories/', Category),
+    ))
+    def test_01_genres_and_categories(self, admin_client, client, url,
+                                      model):
+        version = CatalogVersion.get_current()
+        assert client.get(url).json()['count'] == 0
+        data = [{'name': f'Объект {number}', 'slug': f'slug-{number}'}
+                for number in range(30)]
+        response, queries = self.post(admin_client, url, data)
+        assert response.status_code == 201, response.json()
+        assert response.json() == data
+        assert model.objects.count() == 30
+        assert queries <= 10, (
+            f'Проверьте, что POST-запрос со списком к `{url}` не выполняет '
+            'запросы к базе данных для каждого элемента.'
+        )
+        assert CatalogVersion.get_current() != version, (
+            'Проверьте, что массовое создание сбрасывает кэш каталога.'
+        )
+        assert client.get(url).json()['count'] == 30, (
+            'Проверьте, что массовое создание сбрасывает кэш ответов.'
+        )
+
+    def test_02_slug_errors(self, admin_client, catalog):
+        url = '/api/v1/genres/'
+        response = admin_client.post(url, data=[
+            {'name': 'Новый', 'slug': 'new'},
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Без slug'},
+            {'name': 'Ещё раз', 'slug': 'new'},
+        ], format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert len(errors) == 4, (
+            'Проверьте, что ошибки возвращаются по каждому элементу списка.'
+        )
+        assert errors[0] == {}
+        assert list(errors[1]) == ['slug']
+        assert list(errors[2]) == ['slug']
+        assert list(errors[3]) == ['slug']
+        assert not Genre.objects.filter(slug='new').exists(), (
+            'Проверьте, что при ошибке не создаётся ни один объект.'
+        )
+
+    def test_03_titles(self, admin_client, client, catalog):
+        url = '/api/v1/titles/'
+        assert client.get(url).json()['count'] == 0
+        data = [{
+            'name': f'Фильм {number}', 'year': 1990 + number,
+            'description': 'Описание', 'category': 'movie',
+            'genre': ['drama', 'comedy', 'drama'][:number % 3 + 1],
+        } for number in range(30)]
+        response, queries = self.post(admin_client, url, data)
+        assert response.status_code == 201, response.json()
+        created = response.json()
+        assert len(created) == 30
+        assert [title['name'] for title in created] == [
+            item['name'] for item in data
+        ]
+        assert queries <= 10, (
+            f'Проверьте, что POST-запрос со списком к `{url}` вставляет '
+            f'произведения и жанры пачками: {queries} запросов.'
+        )
+        for title in created:
+            assert title == client.get(f'{url}{title["id"]}/').json()
+        assert created[2]['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Комедия', 'slug': 'comedy'},
+        ]
+        assert created[0]['rating'] is None
+        assert client.get(url).json()['count'] == 30
+        assert client.get(f'{url}?q=Фильм 17').json()['results'][0][
+            'id'
+        ] == created[17]['id'], (
+            'Проверьте, что созданные списком произведения попадают '
+            'в полнотекстовый поиск.'
+        )
+
+    def test_04_title_errors(self, admin_client, catalog):
+        url = '/api/v1/titles/'
+        response = admin_client.post(url, data=[
+            {'name': 'Фильм', 'year': 2000, 'genre': ['drama'],
+             'category': 'movie'},
+            {'name': 'Фильм', 'year': 2000, 'genre': ['unknown'],
+             'category': 'movie'},
+            {'name': 'Фильм', 'year': 3000, 'genre': ['drama'],
+             'category': 'movie'},
+        ], format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert list(errors[1]) == ['genre']
+        assert list(errors[2]) == ['year']
+        assert not Title.objects.exists()
+        assert admin_client.post(url, data=[],
+                                 format='json').status_code == 400
+
+    def test_05_limits_and_permissions(self, admin_client, user_client,
+                                       catalog):
+        url = '/api/v1/genres/'
+        data = [{'name': 'Жанр', 'slug': f'genre-{number}'}
+                for number in range(3)]
+        assert user_client.post(url, data=data,
+                                format='json').status_code == 403
+        with override_settings(BULK_CREATE_MAX_ITEMS=2):
+            response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что размер списка ограничен BULK_CREATE_MAX_ITEMS.'
+        )
+
+    def test_06_single_create_response(self, admin_client, catalog):
+        Title.objects.create(name='Другое', year=1999)
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Фильм', 'year': 2000, 'genre': ['drama'],
+            'category': 'movie',
+        }, format='json')
+        assert response.status_code == 201
+        title = Title.objects.get(name='Фильм')
+        assert response.json()['id'] == title.id
+        assert response.json()['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'}
+        ]
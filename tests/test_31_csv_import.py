@@ -0,0 +1,70 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from titles.catalog import catalog_cache
+from titles.models import CatalogVersion, Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31CsvImport:
+
+    def write(self, tmp_path, name, text):
+        (tmp_path / f'{name}.csv').write_text(text, encoding='utf-8')
+
+    def fulfill(self, tmp_path, *names):
+        call_command('fulfill', *names, path=str(tmp_path),
+                     stdout=StringIO())
+
+    def test_01_loads_rows(self, tmp_path):
+        self.write(tmp_path, 'category', 'id,name,slug\n1,Фильм,movie\n')
+        self.write(tmp_path, 'titles',
+                   'id,name,year,category\n1,Фильм,2000,1\n2,Книга,1990,\n')
+        self.fulfill(tmp_path, 'category', 'titles')
+        assert Category.objects.get().slug == 'movie'
+        assert Title.objects.get(pk=1).category_id == 1
+        assert Title.objects.get(pk=2).category_id is None
+
+    def test_02_bumps_catalog_version(self, tmp_path):
+        assert catalog_cache.get_by_slug(Genre, 'drama') is None
+        version = CatalogVersion.get_current()
+        self.write(tmp_path, 'genre', 'id,name,slug\n1,Драма,drama\n')
+        self.fulfill(tmp_path, 'genre')
+        assert CatalogVersion.get_current() != version, (
+            'Проверьте, что загрузка из csv увеличивает версию каталога.'
+        )
+        assert catalog_cache.get_by_slug(Genre, 'drama') is not None
+
+    def test_03_empty_file(self, tmp_path):
+        self.write(tmp_path, 'category', '')
+        with pytest.raises(CommandError, match='category.csv: no header'):
+            self.fulfill(tmp_path, 'category')
+
+    @pytest.mark.parametrize('value', ('abc', '1.5'))
+    def test_04_bad_reference(self, tmp_path, value):
+        self.write(tmp_path, 'category', 'id,name,slug\n1,Фильм,movie\n')
+        self.write(tmp_path, 'titles', (
+            'id,name,year,category\n1,Фильм,2000,1\n'
+            f'2,Книга,1990,{value}\n'
+        ))
+        with pytest.raises(CommandError, match=r'titles.csv, line 3'):
+            self.fulfill(tmp_path, 'category', 'titles')
+        assert not Title.objects.exists(), (
+            'Проверьте, что файл с ошибкой не загружается частично.'
+        )
+
+    def test_05_bad_rows(self, tmp_path):
+        self.write(tmp_path, 'category', 'id,name,slug\n1,Фильм,movie,x\n')
+        with pytest.raises(CommandError, match=r'category.csv, line 2'):
+            self.fulfill(tmp_path, 'category')
+        self.write(tmp_path, 'category', 'id,name,slug\n1,Фильм\n')
+        with pytest.raises(CommandError, match=r'category.csv, line 2'):
+            self.fulfill(tmp_path, 'category')
+        self.write(tmp_path, 'category', 'id,name,unknown\n1,Фильм,x\n')
+        with pytest.raises(CommandError, match='category.csv'):
+            self.fulfill(tmp_path, 'category')
+        self.write(tmp_path, 'genre_title', 'id,title_id,genre_id\n1,,1\n')
+        with pytest.raises(CommandError, match=r'genre_title.csv, line 2'):
+            self.fulfill(tmp_path, 'genre_title')